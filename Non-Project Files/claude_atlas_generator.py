@@ -11,13 +11,38 @@ import ast
 import os
 import sys
 import inspect
+import io
 from typing import Dict, List, Set, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from pathlib import Path
 import json
 import re
+from functools import partial
 
-@dataclass
+from generator_common import PrunedVisitor, cached_analysis, node_docstring, run_per_file
+
+# Navigation guide categories in display order, with the name keywords that
+# select each one; the first category with a matching keyword wins
+NAVIGATION_CATEGORIES = [
+    ("Bootstrap & Initialization", ('init', 'start', 'configure', 'connect', 'bootstrap')),
+    ("Client Communication", ('handle', 'emit', 'client', 'socket', 'event')),
+    ("Core Logic & AI", ('reason', 'loop', 'process', 'model', 'agent', 'orchestrat')),
+    ("Tool Execution", ('tool', 'execute', 'handle_', 'command')),
+    ("Data & Memory", ('memory', 'store', 'db', 'data', 'persist')),
+    ("Parsing & Processing", ('parse', 'extract', 'format', 'clean')),
+]
+DEFAULT_CATEGORY = "Utilities"
+
+# One anchored alternation with a lookahead branch per category, tried in category
+# order, so a single C-level match picks the first category with any keyword in the
+# name (a plain search would instead pick whichever keyword occurs leftmost)
+_CATEGORY_RE = re.compile("|".join(
+    f"(?=.*?(?:{'|'.join(map(re.escape, words))}))(?P<c{index}>)"
+    for index, (_, words) in enumerate(NAVIGATION_CATEGORIES)
+), re.DOTALL)
+_CATEGORY_BY_GROUP = {f"c{index}": category for index, (category, _) in enumerate(NAVIGATION_CATEGORIES)}
+
+@dataclass(slots=True)
 class FunctionData:
     """Data structure for a single function's information."""
     name: str
@@ -34,8 +59,11 @@ class FunctionData:
     parameters: List[str] = field(default_factory=list)
     returns: Optional[str] = None
     decorators: List[str] = field(default_factory=list)
+    category: str = DEFAULT_CATEGORY
+    name_lower: str = ""  # full_name lowercased once, for keyword matching
+    first_doc_line: str = ""  # first line of the docstring, as shown in every report
 
-@dataclass
+@dataclass(slots=True)
 class CallHierarchy:
     """Represents a hierarchical call tree."""
     function_name: str
@@ -55,33 +83,27 @@ class StaticAtlasGenerator:
         """Analyze multiple Python files and build the complete function database."""
         print("📊 Analyzing Python files...")
         
-        for file_path in file_paths:
-            if os.path.exists(file_path) and file_path.endswith('.py'):
-                self._analyze_single_file(file_path)
-                print(f"  ✓ {file_path}")
+        python_files = [fp for fp in file_paths if os.path.exists(fp) and fp.endswith('.py')]
+        # Files are analyzed independently (in parallel for larger runs) and merged in order
+        analyze = partial(cached_analysis, analyze_single_file)
+        for file_path, result, error in run_per_file(analyze, python_files):
+            if error is not None:
+                print(f"⚠️  Error analyzing {file_path}: {error}")
+            else:
+                module_name, functions, call_graph = result
+                self.modules[module_name] = file_path
+                self.functions.update(functions)
+                self.call_graph.update(call_graph)
+            print(f"  ✓ {file_path}")
         
         self._build_call_relationships()
         self._calculate_complexity_scores()
         self._identify_entry_points_and_critical_functions()
+        self._categorize_functions()
+        self._freeze_call_sets()
         
         print(f"📈 Analysis complete: {len(self.functions)} functions found")
     
-    def _analyze_single_file(self, file_path: str) -> None:
-        """Analyze a single Python file."""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                source = f.read()
-            
-            tree = ast.parse(source)
-            module_name = Path(file_path).stem
-            self.modules[module_name] = file_path
-            
-            analyzer = FileAnalyzer(module_name, file_path, self.functions, self.call_graph)
-            analyzer.visit(tree)
-            
-        except Exception as e:
-            print(f"⚠️  Error analyzing {file_path}: {e}")
-    
     def _build_call_relationships(self) -> None:
         """Build reverse call graph and update function call relationships."""
         for caller, callees in self.call_graph.items():
@@ -96,6 +118,12 @@ class StaticAtlasGenerator:
                 if callee in self.functions:
                     self.functions[callee].called_by.add(caller)
     
+    def _freeze_call_sets(self) -> None:
+        """Freeze each function's call sets once relationships are final."""
+        for func_data in self.functions.values():
+            func_data.calls_made = frozenset(func_data.calls_made)
+            func_data.called_by = frozenset(func_data.called_by)
+    
     def _calculate_complexity_scores(self) -> None:
         """Calculate complexity scores based on calls made/received."""
         for func_name, func_data in self.functions.items():
@@ -121,9 +149,25 @@ class StaticAtlasGenerator:
             if calls_in >= 3 or calls_out >= 5:
                 func_data.is_critical = True
     
+    def _categorize_functions(self) -> None:
+        """Assign each function its navigation category once, from its name."""
+        for func_data in self.functions.values():
+            match = _CATEGORY_RE.match(func_data.name_lower)
+            func_data.category = _CATEGORY_BY_GROUP[match.lastgroup] if match else DEFAULT_CATEGORY
+    
+    def _render(self, section, *args) -> str:
+        """Render a write-based section into a string."""
+        buf = io.StringIO()
+        section(buf.write, *args)
+        return buf.getvalue()
+    
     def generate_function_directory(self) -> str:
         """Generate the function directory section of the atlas."""
-        lines = ["# FUNCTION DIRECTORY", ""]
+        return self._render(self.write_function_directory)
+    
+    def write_function_directory(self, write) -> None:
+        """Write the function directory section of the atlas."""
+        write("# FUNCTION DIRECTORY\n")
         
         # Group functions by module
         by_module = {}
@@ -134,8 +178,7 @@ class StaticAtlasGenerator:
             by_module[module].append(func_data)
         
         for module_name in sorted(by_module.keys()):
-            lines.append(f"## {module_name}.py")
-            lines.append("")
+            write(f"\n## {module_name}.py\n")
             
             functions = sorted(by_module[module_name], key=lambda x: x.line_number)
             
@@ -153,189 +196,180 @@ class StaticAtlasGenerator:
                 if indicator_str:
                     indicator_str = f" [{indicator_str}]"
                 
-                lines.append(f"**{func.full_name}**{indicator_str}")
+                write(f"\n**{func.full_name}**{indicator_str}")
                 
                 # Add docstring summary (first line only)
-                if func.docstring:
-                    first_line = func.docstring.split('\n')[0].strip()
-                    if first_line:
-                        lines.append(f"  {first_line}")
+                if func.first_doc_line:
+                    write(f"\n  {func.first_doc_line}")
                 
                 # Add type signature if available
                 if func.parameters or func.returns:
                     params_str = ", ".join(func.parameters)
                     return_str = f" -> {func.returns}" if func.returns else ""
-                    lines.append(f"  `({params_str}){return_str}`")
+                    write(f"\n  `({params_str}){return_str}`")
                 
                 # Add call statistics
                 calls_out = len(func.calls_made)
                 calls_in = len(func.called_by)
-                lines.append(f"  Calls: {calls_out} out, {calls_in} in | Complexity: {func.complexity_score}")
-                
-                lines.append("")
-        
-        return "\n".join(lines)
+                write(f"\n  Calls: {calls_out} out, {calls_in} in | Complexity: {func.complexity_score}\n")
     
     def generate_hierarchical_call_trees(self, max_depth: int = 4) -> str:
         """Generate hierarchical call trees for entry points."""
-        lines = ["# HIERARCHICAL CALL TREES", ""]
+        return self._render(self.write_hierarchical_call_trees, max_depth)
+    
+    def write_hierarchical_call_trees(self, write, max_depth: int = 4) -> None:
+        """Write hierarchical call trees for entry points."""
+        write("# HIERARCHICAL CALL TREES\n")
         
         # Get entry points
         entry_points = [f for f in self.functions.values() if f.is_entry_point]
         entry_points.sort(key=lambda x: x.full_name)
         
         for entry_func in entry_points:
-            lines.append(f"## {entry_func.full_name}")
+            write(f"\n## {entry_func.full_name}")
             if entry_func.docstring:
-                first_line = entry_func.docstring.split('\n')[0].strip()
-                lines.append(f"*{first_line}*")
-            lines.append("```")
+                write(f"\n*{entry_func.first_doc_line}*")
+            write("\n```")
             
             hierarchy = self._build_call_hierarchy(entry_func.full_name, max_depth)
-            tree_lines = self._format_call_hierarchy(hierarchy)
-            lines.extend(tree_lines)
+            self._write_call_hierarchy(write, hierarchy)
             
-            lines.append("```")
-            lines.append("")
-        
-        return "\n".join(lines)
+            write("\n```\n")
     
-    def _build_call_hierarchy(self, func_name: str, max_depth: int, visited: Set[str] = None) -> CallHierarchy:
-        """Build hierarchical call tree for a function."""
-        if visited is None:
-            visited = set()
+    def _build_call_hierarchy(self, func_name: str, max_depth: int) -> CallHierarchy:
+        """Build hierarchical call tree for a function, using an explicit stack.
         
-        if func_name in visited or max_depth <= 0:
-            return CallHierarchy(func_name, [])
+        Each node carries the frozenset of functions on its path, shared by its
+        children, so cycles are cut without copying a visited set per branch.
+        """
+        root = CallHierarchy(func_name)
+        stack = [(root, max_depth, frozenset())]
         
-        visited.add(func_name)
-        hierarchy = CallHierarchy(func_name)
-        
-        if func_name in self.functions:
-            calls_made = self.functions[func_name].calls_made
-            for called_func in sorted(calls_made):
+        while stack:
+            hierarchy, depth, ancestors = stack.pop()
+            name = hierarchy.function_name
+            if name in ancestors or depth <= 0 or name not in self.functions:
+                continue
+            
+            path = ancestors | {name}
+            for called_func in sorted(self.functions[name].calls_made):
                 if called_func in self.functions:  # Only include functions we know about
-                    sub_hierarchy = self._build_call_hierarchy(called_func, max_depth - 1, visited.copy())
+                    sub_hierarchy = CallHierarchy(called_func)
                     hierarchy.calls.append(sub_hierarchy)
+                    stack.append((sub_hierarchy, depth - 1, path))
         
-        return hierarchy
+        return root
     
-    def _format_call_hierarchy(self, hierarchy: CallHierarchy, depth: int = 0) -> List[str]:
-        """Format call hierarchy into indented text."""
-        lines = []
-        indent = "  " * depth
+    def _write_call_hierarchy(self, write, hierarchy: CallHierarchy, depth: int = 0) -> None:
+        """Write call hierarchy as indented text, one line per node."""
+        stack = [(hierarchy, depth)]
         
-        # Add function info
-        if hierarchy.function_name in self.functions:
-            func = self.functions[hierarchy.function_name]
-            complexity_indicator = ""
-            if func.complexity_score > 10:
-                complexity_indicator = " [HIGH-RISK]"
-            elif func.is_critical:
-                complexity_indicator = " [CRITICAL]"
+        while stack:
+            node, node_depth = stack.pop()
+            indent = _indent(node_depth)
             
-            lines.append(f"{indent}{hierarchy.function_name}{complexity_indicator}")
-        else:
-            lines.append(f"{indent}{hierarchy.function_name} [EXTERNAL]")
-        
-        # Add children
-        for call in hierarchy.calls:
-            lines.extend(self._format_call_hierarchy(call, depth + 1))
-        
-        return lines
+            # Add function info
+            if node.function_name in self.functions:
+                func = self.functions[node.function_name]
+                complexity_indicator = ""
+                if func.complexity_score > 10:
+                    complexity_indicator = " [HIGH-RISK]"
+                elif func.is_critical:
+                    complexity_indicator = " [CRITICAL]"
+                
+                write(f"\n{indent}{node.function_name}{complexity_indicator}")
+            else:
+                write(f"\n{indent}{node.function_name} [EXTERNAL]")
+            
+            # Add children, pushed in reverse so they are emitted in order
+            for call in reversed(node.calls):
+                stack.append((call, node_depth + 1))
     
     def generate_navigation_guide(self) -> str:
         """Generate task-based navigation guide."""
-        lines = ["# NAVIGATION GUIDE", ""]
+        return self._render(self.write_navigation_guide)
+    
+    def write_navigation_guide(self, write) -> None:
+        """Write task-based navigation guide."""
+        write("# NAVIGATION GUIDE\n")
         
-        # Find patterns in function names and docstrings to create categories
-        categories = {
-            "Bootstrap & Initialization": [],
-            "Client Communication": [],
-            "Core Logic & AI": [],
-            "Tool Execution": [],
-            "Data & Memory": [],
-            "Parsing & Processing": [],
-            "Utilities": []
-        }
+        # Group functions by the category assigned during analysis
+        categories = {category: [] for category, _ in NAVIGATION_CATEGORIES}
+        categories[DEFAULT_CATEGORY] = []
         
-        for func_name, func_data in self.functions.items():
-            doc = func_data.docstring or ""
-            name_lower = func_name.lower()
-            
-            # Categorization heuristics based on naming and docstrings
-            if any(word in name_lower for word in ['init', 'start', 'configure', 'connect', 'bootstrap']):
-                categories["Bootstrap & Initialization"].append(func_data)
-            elif any(word in name_lower for word in ['handle', 'emit', 'client', 'socket', 'event']):
-                categories["Client Communication"].append(func_data)
-            elif any(word in name_lower for word in ['reason', 'loop', 'process', 'model', 'agent', 'orchestrat']):
-                categories["Core Logic & AI"].append(func_data)
-            elif any(word in name_lower for word in ['tool', 'execute', 'handle_', 'command']):
-                categories["Tool Execution"].append(func_data)
-            elif any(word in name_lower for word in ['memory', 'store', 'db', 'data', 'persist']):
-                categories["Data & Memory"].append(func_data)
-            elif any(word in name_lower for word in ['parse', 'extract', 'format', 'clean']):
-                categories["Parsing & Processing"].append(func_data)
-            else:
-                categories["Utilities"].append(func_data)
+        for func_data in self.functions.values():
+            categories[func_data.category].append(func_data)
         
         for category, funcs in categories.items():
             if funcs:
-                lines.append(f"## {category}")
+                write(f"\n## {category}")
                 funcs.sort(key=lambda x: (x.complexity_score, x.full_name), reverse=True)
                 
                 for func in funcs[:5]:  # Top 5 per category
                     risk_level = "🔴" if func.complexity_score > 10 else "🟡" if func.complexity_score > 5 else "🟢"
-                    lines.append(f"{risk_level} **{func.full_name}**")
+                    write(f"\n{risk_level} **{func.full_name}**")
                     if func.docstring:
-                        first_line = func.docstring.split('\n')[0].strip()
-                        lines.append(f"   {first_line}")
-                    lines.append("")
-        
-        return "\n".join(lines)
+                        write(f"\n   {func.first_doc_line}")
+                    write("\n")
     
     def generate_atlas(self) -> str:
         """Generate the complete function atlas."""
-        sections = [
-            "# Phoenix Project - Programmatically Generated Function Atlas",
-            "",
-            "Generated from static code analysis of docstrings, type hints, and call relationships.",
-            "",
-            self.generate_function_directory(),
-            "",
-            self.generate_hierarchical_call_trees(),
-            "",
-            self.generate_navigation_guide()
-        ]
-        
-        return "\n".join(sections)
+        return self._render(self.write_atlas)
+    
+    def write_atlas(self, write) -> None:
+        """Write the complete function atlas, section by section."""
+        write("# Phoenix Project - Programmatically Generated Function Atlas\n\n")
+        write("Generated from static code analysis of docstrings, type hints, and call relationships.\n\n")
+        self.write_function_directory(write)
+        write("\n\n")
+        self.write_hierarchical_call_trees(write)
+        write("\n\n")
+        self.write_navigation_guide(write)
     
     def export_json(self) -> Dict[str, Any]:
         """Export atlas data as structured JSON."""
         return {
-            "functions": {
-                name: {
-                    "full_name": func.full_name,
-                    "file_path": func.file_path,
-                    "line_number": func.line_number,
-                    "docstring": func.docstring,
-                    "type_hints": func.type_hints,
-                    "calls_made": list(func.calls_made),
-                    "called_by": list(func.called_by),
-                    "complexity_score": func.complexity_score,
-                    "is_entry_point": func.is_entry_point,
-                    "is_critical": func.is_critical,
-                    "parameters": func.parameters,
-                    "returns": func.returns,
-                    "decorators": func.decorators
-                }
-                for name, func in self.functions.items()
-            },
+            "functions": {name: self._function_json(func) for name, func in self.functions.items()},
             "call_graph": {k: list(v) for k, v in self.call_graph.items()},
             "modules": self.modules
         }
+    
+    def write_json(self, f) -> None:
+        """Stream the export_json() document to f one entry at a time.
+        
+        Writes the same text as json.dump(self.export_json(), f, indent=2) without
+        first materializing the nested dict of every function.
+        """
+        sections = [
+            ("functions", ((name, self._function_json(func)) for name, func in self.functions.items())),
+            ("call_graph", ((k, list(v)) for k, v in self.call_graph.items())),
+            ("modules", self.modules.items()),
+        ]
+        f.write("{")
+        for index, (key, entries) in enumerate(sections):
+            f.write(f"{',' if index else ''}\n  {json.dumps(key)}: ")
+            _write_json_entries(f, entries, "    ")
+        f.write("\n}")
+    
+    def _function_json(self, func: FunctionData) -> Dict[str, Any]:
+        """Build the JSON entry for a single function."""
+        return {
+            "full_name": func.full_name,
+            "file_path": func.file_path,
+            "line_number": func.line_number,
+            "docstring": func.docstring,
+            "type_hints": func.type_hints,
+            "calls_made": list(func.calls_made),
+            "called_by": list(func.called_by),
+            "complexity_score": func.complexity_score,
+            "is_entry_point": func.is_entry_point,
+            "is_critical": func.is_critical,
+            "parameters": func.parameters,
+            "returns": func.returns,
+            "decorators": func.decorators
+        }
 
-class FileAnalyzer(ast.NodeVisitor):
+class FileAnalyzer(PrunedVisitor):
     """AST visitor that extracts function information from a single file."""
     
     def __init__(self, module_name: str, file_path: str, functions: Dict[str, FunctionData], call_graph: Dict[str, Set[str]]):
@@ -343,27 +377,34 @@ class FileAnalyzer(ast.NodeVisitor):
         self.file_path = file_path
         self.functions = functions
         self.call_graph = call_graph
-        self.current_class = None
-        self.current_function = None
+        self.current_class: Optional[str] = None
+        self.current_function: Optional[str] = None
         
-    def visit_ClassDef(self, node):
+    def visit(self, node: ast.AST) -> Any:
+        """Dispatch to a handler via the _DISPATCH table instead of a getattr per node."""
+        handler = self._DISPATCH.get(type(node))
+        if handler is None:
+            return self.generic_visit(node)
+        return handler(self, node)
+    
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
         """Handle class definitions."""
         old_class = self.current_class
         self.current_class = node.name
         self.generic_visit(node)
         self.current_class = old_class
     
-    def visit_FunctionDef(self, node):
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
         """Extract function information."""
-        # Build full function name
+        # Build full function name, interned since it recurs as a key and in call sets
         if self.current_class:
-            full_name = f"{self.module_name}.{self.current_class}.{node.name}"
+            full_name = sys.intern(f"{self.module_name}.{self.current_class}.{node.name}")
         else:
-            full_name = f"{self.module_name}.{node.name}"
+            full_name = sys.intern(f"{self.module_name}.{node.name}")
         
         # Extract type hints
-        type_hints = {}
-        parameters = []
+        type_hints: Dict[str, str] = {}
+        parameters: List[str] = []
         
         for arg in node.args.args:
             param_name = arg.arg
@@ -375,17 +416,21 @@ class FileAnalyzer(ast.NodeVisitor):
         if node.returns:
             returns = self._extract_annotation(node.returns)
         
+        docstring = node_docstring(node)
+        
         # Create function data
         func_data = FunctionData(
             name=node.name,
             full_name=full_name,
             file_path=self.file_path,
             line_number=node.lineno,
-            docstring=ast.get_docstring(node),
+            docstring=docstring,
             type_hints=type_hints,
             parameters=parameters,
             returns=returns,
-            decorators=[self._extract_name(dec) for dec in node.decorator_list]
+            decorators=[self._extract_name(dec) for dec in node.decorator_list],
+            name_lower=full_name.lower(),
+            first_doc_line=docstring.split('\n')[0].strip() if docstring else ""
         )
         
         self.functions[full_name] = func_data
@@ -397,41 +442,81 @@ class FileAnalyzer(ast.NodeVisitor):
         self.generic_visit(node)
         self.current_function = old_function
     
-    def visit_Call(self, node):
+    def visit_Call(self, node: ast.Call) -> None:
         """Track function calls."""
         if self.current_function:
             call_name = self._extract_call_name(node)
             if call_name:
-                self.call_graph[self.current_function].add(call_name)
+                self.call_graph[self.current_function].add(sys.intern(call_name))
         self.generic_visit(node)
     
-    def _extract_annotation(self, node) -> str:
-        """Extract type annotation as string."""
-        if isinstance(node, ast.Name):
+    def _extract_annotation(self, node: ast.expr) -> str:
+        """Extract type annotation as string, comparing exact node types (AST classes are never subclassed)."""
+        node_type = type(node)
+        if node_type is ast.Name:
             return node.id
-        elif isinstance(node, ast.Attribute):
+        elif node_type is ast.Attribute:
             return f"{self._extract_name(node.value)}.{node.attr}"
-        elif isinstance(node, ast.Subscript):
+        elif node_type is ast.Subscript:
             value = self._extract_name(node.value)
             slice_val = self._extract_name(node.slice)
             return f"{value}[{slice_val}]"
         else:
             return ast.unparse(node) if hasattr(ast, 'unparse') else str(node)
     
-    def _extract_name(self, node) -> str:
-        """Extract name from AST node."""
-        if isinstance(node, ast.Name):
-            return node.id
-        elif isinstance(node, ast.Attribute):
-            return f"{self._extract_name(node.value)}.{node.attr}"
-        else:
-            return str(type(node).__name__)
+    def _extract_name(self, node: ast.expr) -> str:
+        """Extract name from AST node, walking attribute chains iteratively."""
+        parts: List[str] = []
+        while type(node) is ast.Attribute:
+            parts.append(node.attr)
+            node = node.value
+        parts.append(node.id if type(node) is ast.Name else str(type(node).__name__))
+        return ".".join(reversed(parts))
     
-    def _extract_call_name(self, node) -> str:
+    def _extract_call_name(self, node: ast.AST) -> str:
         """Extract the full name of a function call."""
-        if isinstance(node, ast.Call):
+        if type(node) is ast.Call:
             return self._extract_name(node.func)
         return ""
+    
+    # Node type -> handler, built once so visit() skips the name formatting and getattr
+    _DISPATCH = {
+        ast.ClassDef: visit_ClassDef,
+        ast.FunctionDef: visit_FunctionDef,
+        ast.Call: visit_Call,
+    }
+
+# Indent strings by depth, extended on demand and shared by every formatted tree
+_INDENT_CACHE: List[str] = []
+
+def _indent(depth: int) -> str:
+    """Return the two-space indent for a tree depth without rebuilding it each time."""
+    while len(_INDENT_CACHE) <= depth:
+        _INDENT_CACHE.append("  " * len(_INDENT_CACHE))
+    return _INDENT_CACHE[depth]
+
+def _write_json_entries(f, entries, indent: str) -> None:
+    """Write (key, value) pairs as a JSON object nested at the given indent, matching indent=2 output."""
+    first = True
+    for key, value in entries:
+        body = json.dumps(value, indent=2).replace("\n", "\n" + indent)
+        f.write(f"{'{' if first else ','}\n{indent}{json.dumps(key)}: {body}")
+        first = False
+    f.write("{}" if first else f"\n{indent[:-2]}}}")
+
+def analyze_single_file(file_path: str) -> Tuple[str, Dict[str, FunctionData], Dict[str, Set[str]]]:
+    """Analyze a single Python file into its module name, functions and call graph."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    
+    tree = ast.parse(source)
+    module_name = Path(file_path).stem
+    functions: Dict[str, FunctionData] = {}
+    call_graph: Dict[str, Set[str]] = {}
+    
+    analyzer = FileAnalyzer(module_name, file_path, functions, call_graph)
+    analyzer.visit(tree)
+    return module_name, functions, call_graph
 
 def main():
     """Main entry point."""
@@ -446,18 +531,16 @@ def main():
     generator = StaticAtlasGenerator()
     generator.analyze_files(file_paths)
     
-    # Output markdown atlas
-    atlas_content = generator.generate_atlas()
+    # Output markdown atlas, streamed straight to the file
     atlas_file = "function_atlas.md"
     with open(atlas_file, 'w', encoding='utf-8') as f:
-        f.write(atlas_content)
+        generator.write_atlas(f.write)
     print(f"📖 Function atlas generated: {atlas_file}")
     
     # Output JSON data
-    json_data = generator.export_json()
     json_file = "function_atlas.json"
     with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, indent=2)
+        generator.write_json(f)
     print(f"📊 JSON data exported: {json_file}")
 
 if __name__ == "__main__":
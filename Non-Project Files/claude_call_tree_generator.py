@@ -7,36 +7,52 @@ in a tree format with proper Unicode box-drawing characters.
 """
 
 import ast
+import io
 import os
 import sys
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Any, Optional, Tuple
 from pathlib import Path
 from collections import defaultdict
+from functools import partial
 
-class CallTreeAnalyzer(ast.NodeVisitor):
+from generator_common import PrunedVisitor, cached_analysis, run_per_file
+
+# Box-drawing pieces for a child line and for the prefix continued beneath it
+BRANCH, LAST_BRANCH = "├── ", "└── "
+PIPE_CONTINUATION, BLANK_CONTINUATION = "│   ", "    "
+
+
+class CallTreeAnalyzer(PrunedVisitor):
     """AST visitor that builds function call relationships."""
     
     def __init__(self, module_name: str):
         self.module_name = module_name
-        self.current_function = None
-        self.current_class = None
+        self.current_function: Optional[str] = None
+        self.current_class: Optional[str] = None
         self.call_graph: Dict[str, Set[str]] = defaultdict(set)
         self.all_functions: Set[str] = set()
         
-    def visit_ClassDef(self, node):
+    def visit(self, node: ast.AST) -> Any:
+        """Dispatch to a handler via the _DISPATCH table instead of a getattr per node."""
+        handler = self._DISPATCH.get(type(node))
+        if handler is None:
+            return self.generic_visit(node)
+        return handler(self, node)
+    
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
         """Handle class definitions."""
         old_class = self.current_class
         self.current_class = node.name
         self.generic_visit(node)
         self.current_class = old_class
     
-    def visit_FunctionDef(self, node):
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
         """Track function definitions and analyze their calls."""
-        # Build full function name
+        # Build full function name, interned since it recurs as a key and in call sets
         if self.current_class:
-            full_name = f"{self.module_name}.{self.current_class}.{node.name}"
+            full_name = sys.intern(f"{self.module_name}.{self.current_class}.{node.name}")
         else:
-            full_name = f"{self.module_name}.{node.name}"
+            full_name = sys.intern(f"{self.module_name}.{node.name}")
         
         self.all_functions.add(full_name)
         
@@ -50,40 +66,46 @@ class CallTreeAnalyzer(ast.NodeVisitor):
         self.generic_visit(node)
         self.current_function = old_function
     
-    def visit_Call(self, node):
+    def visit_Call(self, node: ast.Call) -> None:
         """Track function calls."""
         if self.current_function:
             call_name = self._extract_call_name(node)
             if call_name and call_name != self.current_function:  # Avoid self-calls
-                self.call_graph[self.current_function].add(call_name)
+                self.call_graph[self.current_function].add(sys.intern(call_name))
         self.generic_visit(node)
     
-    def _extract_call_name(self, node) -> Optional[str]:
+    def _extract_call_name(self, node: ast.AST) -> Optional[str]:
         """Extract the full name of a function call."""
-        if not isinstance(node, ast.Call):
+        if type(node) is not ast.Call:
             return None
             
         func = node.func
         
         # Handle different call patterns
-        if isinstance(func, ast.Name):
+        if type(func) is ast.Name:
             # Simple function call: func()
             return func.id
-        elif isinstance(func, ast.Attribute):
+        elif type(func) is ast.Attribute:
             # Method call: obj.method() or module.func()
             return self._extract_attribute_chain(func)
         else:
             return None
     
-    def _extract_attribute_chain(self, node) -> str:
-        """Extract full attribute chain like module.Class.method."""
-        if isinstance(node, ast.Name):
-            return node.id
-        elif isinstance(node, ast.Attribute):
-            base = self._extract_attribute_chain(node.value)
-            return f"{base}.{node.attr}"
-        else:
-            return str(type(node).__name__)
+    def _extract_attribute_chain(self, node: ast.expr) -> str:
+        """Extract full attribute chain like module.Class.method, walking it iteratively."""
+        parts: List[str] = []
+        while type(node) is ast.Attribute:
+            parts.append(node.attr)
+            node = node.value
+        parts.append(node.id if type(node) is ast.Name else str(type(node).__name__))
+        return ".".join(reversed(parts))
+    
+    # Node type -> handler, built once so visit() skips the name formatting and getattr
+    _DISPATCH = {
+        ast.ClassDef: visit_ClassDef,
+        ast.FunctionDef: visit_FunctionDef,
+        ast.Call: visit_Call,
+    }
 
 class CallTreeGenerator:
     """Generates hierarchical call trees from analyzed code."""
@@ -91,25 +113,39 @@ class CallTreeGenerator:
     def __init__(self):
         self.call_graph: Dict[str, Set[str]] = {}
         self.all_functions: Set[str] = set()
+        self._sorted_calls: Dict[str, List[str]] = {}  # function -> sorted callees, filled on first use
+        self.called_by: Dict[str, Set[str]] = {}  # callee -> callers, built once after analysis
     
     def analyze_files(self, file_paths: List[str]) -> None:
         """Analyze multiple Python files."""
         print("🔍 Analyzing files for call relationships...")
+        self._sorted_calls.clear()
         print(f"🔧 Debug: Files to analyze: {file_paths}")
         
+        python_files = []
         for file_path in file_paths:
             print(f"🔧 Debug: Checking file: {file_path}")
             if os.path.exists(file_path):
                 print(f"🔧 Debug: File exists: {file_path}")
                 if file_path.endswith('.py'):
                     print(f"🔧 Debug: File is Python: {file_path}")
-                    self._analyze_file(file_path)
-                    print(f"  ✓ {file_path}")
+                    python_files.append(file_path)
                 else:
                     print(f"🔧 Debug: File is not Python: {file_path}")
             else:
                 print(f"🔧 Debug: File does not exist: {file_path}")
         
+        # Files are analyzed independently (in parallel for larger runs) and merged in order
+        analyze = partial(cached_analysis, analyze_call_graph)
+        for file_path, result, error in run_per_file(analyze, python_files):
+            if error is not None:
+                print(f"⚠️  Error analyzing {file_path}: {error}")
+            else:
+                self._merge_results(*result)
+            print(f"  ✓ {file_path}")
+        
+        self._build_reverse_index()
+        
         total_calls = sum(len(calls) for calls in self.call_graph.values())
         print(f"📊 Found {len(self.all_functions)} functions with {total_calls} call relationships")
         
@@ -119,27 +155,13 @@ class CallTreeGenerator:
             print("   - Files don't contain function definitions") 
             print("   - There's an issue with the AST parsing")
     
-    def _analyze_file(self, file_path: str) -> None:
-        """Analyze a single Python file."""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                source = f.read()
-            
-            tree = ast.parse(source)
-            module_name = Path(file_path).stem
-            
-            analyzer = CallTreeAnalyzer(module_name)
-            analyzer.visit(tree)
-            
-            # Merge results
-            self.all_functions.update(analyzer.all_functions)
-            for func, calls in analyzer.call_graph.items():
-                if func not in self.call_graph:
-                    self.call_graph[func] = set()
-                self.call_graph[func].update(calls)
-                
-        except Exception as e:
-            print(f"⚠️  Error analyzing {file_path}: {e}")
+    def _merge_results(self, all_functions: Set[str], call_graph: Dict[str, Set[str]]) -> None:
+        """Merge one file's functions and call relationships into the totals."""
+        self.all_functions.update(all_functions)
+        for func, calls in call_graph.items():
+            if func not in self.call_graph:
+                self.call_graph[func] = set()
+            self.call_graph[func].update(calls)
     
     def generate_call_tree(self, root_function: str, max_depth: int = 5) -> List[str]:
         """Generate a hierarchical call tree starting from a root function."""
@@ -147,97 +169,119 @@ class CallTreeGenerator:
             return [f"{root_function} [NOT FOUND]"]
         
         lines = []
-        self._build_tree_recursive(root_function, lines, "", set(), max_depth)
+        self._build_tree(root_function, lines.append, max_depth)
         return lines
     
-    def _build_tree_recursive(self, function: str, lines: List[str], prefix: str, visited: Set[str], depth: int) -> None:
-        """Recursively build the call tree with proper Unicode characters."""
-        if depth <= 0 or function in visited:
-            if function in visited:
-                lines.append(f"{prefix}[CIRCULAR: {function}]")
-            return
-        
-        visited.add(function)
+    def _build_tree(self, root_function: str, emit, max_depth: int) -> None:
+        """Build the call tree with proper Unicode characters, using an explicit stack.
         
-        # Add current function
-        lines.append(f"{prefix}{function}")
-        
-        # Get called functions
-        called_functions = sorted(self.call_graph.get(function, set()))
-        
-        # Draw tree branches
-        for i, called_func in enumerate(called_functions):
-            is_last = (i == len(called_functions) - 1)
+        Each pending entry is either a ready-made line or a function to expand,
+        together with its prefix, remaining depth and the frozenset of functions
+        on its path (shared by all siblings instead of copied per child).
+        """
+        stack = [(None, root_function, "", max_depth, frozenset())]
+        while stack:
+            line, function, prefix, depth, ancestors = stack.pop()
+            if line is not None:
+                emit(line)
+                continue
             
-            if is_last:
-                # Last child: └──
-                child_prefix = prefix + "└── "
-                continuation_prefix = prefix + "    "
-            else:
-                # Not last child: ├──
-                child_prefix = prefix + "├── "
-                continuation_prefix = prefix + "│   "
+            if depth <= 0 or function in ancestors:
+                if function in ancestors:
+                    emit(f"{prefix}[CIRCULAR: {function}]")
+                continue
             
-            # Add the called function
-            if called_func in self.all_functions:
-                # It's a function we know about, recurse
-                lines.append(f"{child_prefix}{called_func}")
-                self._build_tree_recursive(called_func, lines, continuation_prefix, visited.copy(), depth - 1)
-            else:
-                # External function
-                lines.append(f"{child_prefix}{called_func} [EXTERNAL]")
-        
-        visited.remove(function)
+            # Add current function
+            emit(f"{prefix}{function}")
+            
+            # Get called functions; at the last level they are listed but never expanded
+            called_functions = self._sorted_callees(function)
+            leaf_level = depth == 1
+            path = ancestors if leaf_level else ancestors | {function}
+            
+            # Draw tree branches; entries are pushed in reverse so they pop in order
+            pending = []
+            for i, called_func in enumerate(called_functions):
+                is_last = (i == len(called_functions) - 1)
+                
+                if is_last:
+                    # Last child: └──
+                    child_prefix = prefix + LAST_BRANCH
+                    continuation_prefix = prefix + BLANK_CONTINUATION
+                else:
+                    # Not last child: ├──
+                    child_prefix = prefix + BRANCH
+                    continuation_prefix = prefix + PIPE_CONTINUATION
+                
+                # Add the called function
+                if called_func in self.all_functions:
+                    # It's a function we know about, expand it next
+                    pending.append((f"{child_prefix}{called_func}", None, None, None, None))
+                    if not leaf_level:
+                        pending.append((None, called_func, continuation_prefix, depth - 1, path))
+                    elif called_func == function or called_func in path:
+                        pending.append((f"{continuation_prefix}[CIRCULAR: {called_func}]", None, None, None, None))
+                else:
+                    # External function
+                    pending.append((f"{child_prefix}{called_func} [EXTERNAL]", None, None, None, None))
+            stack.extend(reversed(pending))
     
-    def find_entry_points(self) -> List[str]:
-        """Find potential entry point functions (called by few others)."""
-        call_counts = defaultdict(int)
-        
-        # Count how many times each function is called
+    def _build_reverse_index(self) -> None:
+        """Build the callee -> callers index in a single pass over all edges."""
+        called_by: Dict[str, Set[str]] = defaultdict(set)
         for caller, callees in self.call_graph.items():
             for callee in callees:
-                call_counts[callee] += 1
-        
-        # Find functions that are called 0-1 times (potential entry points)
-        entry_points = []
-        for func in self.all_functions:
-            if call_counts[func] <= 1:
-                entry_points.append(func)
+                called_by[callee].add(caller)
+        self.called_by = dict(called_by)
+    
+    def _sorted_callees(self, function: str) -> List[str]:
+        """Return the sorted callees of a function, sorting each list only once."""
+        called_functions = self._sorted_calls.get(function)
+        if called_functions is None:
+            called_functions = sorted(self.call_graph.get(function, set()))
+            self._sorted_calls[function] = called_functions
+        return called_functions
+    
+    def find_entry_points(self) -> List[str]:
+        """Find potential entry point functions (called by few others)."""
+        # Find functions that are called by 0-1 others (potential entry points)
+        entry_points = [func for func in self.all_functions if len(self.called_by.get(func, ())) <= 1]
         
         # Sort by module and function name
         return sorted(entry_points)
     
     def generate_all_trees(self, max_depth: int = 4) -> str:
         """Generate call trees for all entry points."""
+        buf = io.StringIO()
+        self.write_all_trees(buf.write, max_depth)
+        return buf.getvalue()
+    
+    def write_all_trees(self, write, max_depth: int = 4) -> None:
+        """Write call trees for all entry points."""
         entry_points = self.find_entry_points()
         
-        lines = ["# Hierarchical Call Trees", ""]
-        lines.append(f"Generated from static analysis. Found {len(entry_points)} potential entry points.")
-        lines.append("")
-        
-        for entry_point in entry_points:
-            lines.append(f"## {entry_point}")
-            lines.append("```")
-            tree_lines = self.generate_call_tree(entry_point, max_depth)
-            lines.extend(tree_lines)
-            lines.append("```")
-            lines.append("")
-        
-        return "\n".join(lines)
+        write("# Hierarchical Call Trees\n\n")
+        write(f"Generated from static analysis. Found {len(entry_points)} potential entry points.\n")
+        self._write_trees(write, entry_points, max_depth)
     
     def generate_specific_trees(self, functions: List[str], max_depth: int = 4) -> str:
         """Generate call trees for specific functions."""
-        lines = ["# Hierarchical Call Trees", ""]
-        
+        buf = io.StringIO()
+        write = buf.write
+        write("# Hierarchical Call Trees\n")
+        self._write_trees(write, functions, max_depth)
+        return buf.getvalue()
+    
+    def _write_trees(self, write, functions: List[str], max_depth: int) -> None:
+        """Write one fenced call tree per function, each line led by its newline."""
+        emit_line = lambda line: write(f"\n{line}")
         for function in functions:
-            lines.append(f"## {function}")
-            lines.append("```")
-            tree_lines = self.generate_call_tree(function, max_depth)
-            lines.extend(tree_lines)
-            lines.append("```")
-            lines.append("")
-        
-        return "\n".join(lines)
+            write(f"\n## {function}\n```")
+            if function in self.call_graph:
+                self._build_tree(function, emit_line, max_depth)
+            else:
+                emit_line(f"{function} [NOT FOUND]")
+            write("\n```\n")
     
     def print_function_list(self) -> None:
         """Print all discovered functions for reference."""
@@ -254,6 +298,18 @@ class CallTreeGenerator:
                 call_count = len(self.call_graph.get(func, set()))
                 print(f"  {func} ({call_count} calls)")
 
+def analyze_call_graph(file_path: str) -> Tuple[Set[str], Dict[str, Set[str]]]:
+    """Analyze a single Python file into its function names and call graph."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    
+    tree = ast.parse(source)
+    module_name = Path(file_path).stem
+    
+    analyzer = CallTreeAnalyzer(module_name)
+    analyzer.visit(tree)
+    return analyzer.all_functions, dict(analyzer.call_graph)
+
 def main():
     """Main entry point."""
     if len(sys.argv) < 2:
@@ -340,13 +396,10 @@ def main():
         for line in tree_lines:
             print(line)
     else:
-        # Generate trees for all entry points
-        content = generator.generate_all_trees(max_depth)
-        
-        # Save to file
+        # Generate trees for all entry points, streamed straight to the file
         output_file = "call_trees.md"
         with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+            generator.write_all_trees(f.write, max_depth)
         print(f"\n📝 Call trees saved to: {output_file}")
 
 if __name__ == "__main__":
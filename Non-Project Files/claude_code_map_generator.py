@@ -7,14 +7,20 @@ the manual summaries, extracting functions, classes, calls, and dependencies.
 """
 
 import ast
+import io
 import os
 import sys
-from typing import Dict, List, Set, Any, Optional
+from typing import Dict, List, Set, Any, Iterator, Optional
 from dataclasses import dataclass, field
 from pathlib import Path
+from collections import defaultdict
+from itertools import chain
 import json
+from functools import partial
 
-@dataclass
+from generator_common import PrunedVisitor, cached_analysis, node_docstring, read_source, run_per_file
+
+@dataclass(slots=True)
 class FunctionInfo:
     name: str
     calls: Set[str] = field(default_factory=set)
@@ -23,8 +29,10 @@ class FunctionInfo:
     decorators: List[str] = field(default_factory=list)
     docstring: Optional[str] = None
     line_number: int = 0
+    calls_line: str = ""  # sorted, comma-joined calls, fixed once the body has been visited
+    creates_line: str = ""  # likewise for creates
 
-@dataclass
+@dataclass(slots=True)
 class ClassInfo:
     name: str
     methods: Dict[str, FunctionInfo] = field(default_factory=dict)
@@ -32,7 +40,7 @@ class ClassInfo:
     docstring: Optional[str] = None
     line_number: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class ModuleInfo:
     name: str
     file_path: str
@@ -41,14 +49,25 @@ class ModuleInfo:
     imports: Set[str] = field(default_factory=set)
     module_variables: Set[str] = field(default_factory=set)
     docstring: Optional[str] = None
+    
+    def all_callables(self) -> Iterator[FunctionInfo]:
+        """Iterate module functions, then each class's methods, without building a list"""
+        return chain(self.functions.values(), *(cls.methods.values() for cls in self.classes.values()))
 
-class CodeMapAnalyzer(ast.NodeVisitor):
+class CodeMapAnalyzer(PrunedVisitor):
     def __init__(self, module_name: str, file_path: str):
         self.module_info = ModuleInfo(module_name, file_path)
-        self.current_class = None
-        self.current_function = None
+        self.current_class: Optional[ClassInfo] = None
+        self.current_function: Optional[FunctionInfo] = None
         
-    def visit_Module(self, node):
+    def visit(self, node: ast.AST) -> Any:
+        """Dispatch to a handler via the _DISPATCH table instead of a getattr per node"""
+        handler = self._DISPATCH.get(type(node))
+        if handler is None:
+            return self.generic_visit(node)
+        return handler(self, node)
+
+    def visit_Module(self, node: ast.Module) -> None:
         """Extract module-level docstring"""
         if (node.body and isinstance(node.body[0], ast.Expr) 
             and isinstance(node.body[0].value, ast.Constant)
@@ -56,18 +75,18 @@ class CodeMapAnalyzer(ast.NodeVisitor):
             self.module_info.docstring = node.body[0].value.value
         self.generic_visit(node)
         
-    def visit_Import(self, node):
+    def visit_Import(self, node: ast.Import) -> None:
         """Track import statements"""
         for alias in node.names:
             self.module_info.imports.add(alias.name)
             
-    def visit_ImportFrom(self, node):
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
         """Track from-import statements"""
         module = node.module or ""
         for alias in node.names:
             self.module_info.imports.add(f"{module}.{alias.name}")
             
-    def visit_Assign(self, node):
+    def visit_Assign(self, node: ast.Assign) -> None:
         """Track module-level variable assignments and object creation"""
         # Module-level variables
         if self.current_class is None and self.current_function is None:
@@ -80,12 +99,12 @@ class CodeMapAnalyzer(ast.NodeVisitor):
             self._track_object_creation(node.value)
         self.generic_visit(node)
         
-    def visit_ClassDef(self, node):
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
         """Analyze class definitions"""
         class_info = ClassInfo(
             name=node.name,
             bases=[self._extract_name(base) for base in node.bases],
-            docstring=ast.get_docstring(node),
+            docstring=node_docstring(node),
             line_number=node.lineno
         )
         
@@ -99,12 +118,12 @@ class CodeMapAnalyzer(ast.NodeVisitor):
         self.module_info.classes[node.name] = class_info
         self.current_class = old_class
         
-    def visit_FunctionDef(self, node):
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
         """Analyze function definitions"""
         func_info = FunctionInfo(
             name=node.name,
             decorators=[self._extract_name(dec) for dec in node.decorator_list],
-            docstring=ast.get_docstring(node),
+            docstring=node_docstring(node),
             line_number=node.lineno
         )
         
@@ -118,6 +137,10 @@ class CodeMapAnalyzer(ast.NodeVisitor):
         # Visit function body
         for item in node.body:
             self.visit(item)
+        
+        # Calls and creates are complete now; sort and join them once for every summary
+        func_info.calls_line = ', '.join(sorted(func_info.calls))
+        func_info.creates_line = ', '.join(sorted(func_info.creates))
             
         # Store function in appropriate location
         if self.current_class:
@@ -127,7 +150,7 @@ class CodeMapAnalyzer(ast.NodeVisitor):
             
         self.current_function = old_function
         
-    def visit_Call(self, node):
+    def visit_Call(self, node: ast.Call) -> None:
         """Track function calls and object creation"""
         if self.current_function:
             call_name = self._extract_call_name(node)
@@ -137,12 +160,12 @@ class CodeMapAnalyzer(ast.NodeVisitor):
         self._track_object_creation(node)
         self.generic_visit(node)
         
-    def _track_object_creation(self, node):
+    def _track_object_creation(self, node: ast.AST) -> None:
         """Detect object creation patterns"""
         if not self.current_function:
             return
             
-        if isinstance(node, ast.Call):
+        if type(node) is ast.Call:
             func_name = self._extract_call_name(node)
             
             # Common object creation patterns
@@ -158,29 +181,42 @@ class CodeMapAnalyzer(ast.NodeVisitor):
                     self.current_function.creates.add(pattern)
                     break
                     
-    def _extract_name(self, node):
-        """Extract name from various AST node types"""
-        if isinstance(node, ast.Name):
-            return node.id
-        elif isinstance(node, ast.Attribute):
-            return f"{self._extract_name(node.value)}.{node.attr}"
-        elif isinstance(node, ast.Constant):
-            return str(node.value)
+    def _extract_name(self, node: ast.expr) -> str:
+        """Extract name from various AST node types, walking attribute chains iteratively"""
+        parts: List[str] = []
+        while type(node) is ast.Attribute:
+            parts.append(node.attr)
+            node = node.value
+        node_type = type(node)
+        if node_type is ast.Name:
+            parts.append(node.id)
+        elif node_type is ast.Constant:
+            parts.append(str(node.value))
         else:
-            return str(type(node).__name__)
+            parts.append(str(node_type.__name__))
+        return ".".join(reversed(parts))
             
-    def _extract_call_name(self, node):
+    def _extract_call_name(self, node: ast.AST) -> Optional[str]:
         """Extract the full name of a function call"""
-        if isinstance(node, ast.Call):
+        if type(node) is ast.Call:
             return self._extract_name(node.func)
         return None
 
+    # Node type -> handler, built once so visit() skips the name formatting and getattr
+    _DISPATCH = {
+        ast.Module: visit_Module,
+        ast.Import: visit_Import,
+        ast.ImportFrom: visit_ImportFrom,
+        ast.Assign: visit_Assign,
+        ast.ClassDef: visit_ClassDef,
+        ast.FunctionDef: visit_FunctionDef,
+        ast.Call: visit_Call,
+    }
+
 def analyze_file(file_path: str) -> ModuleInfo:
     """Analyze a single Python file and return module information"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            source = f.read()
-            
+        source = read_source(file_path)
         tree = ast.parse(source)
         module_name = Path(file_path).stem
         
@@ -192,110 +228,164 @@ def analyze_file(file_path: str) -> ModuleInfo:
         print(f"Error analyzing {file_path}: {e}")
         return ModuleInfo(Path(file_path).stem, file_path)
 
+def _build_prefix_index(modules: List[ModuleInfo]) -> Dict[str, List[Any]]:
+    """Map each leading name segment to the modules owning a name that starts with it
+
+    Every module contributes its own name and its class names; entries keep the
+    module order so interactions are recorded in the same order as before. A plain
+    name is matched by the segment lookup alone, so only dotted module names keep
+    a tuple of prefixes for the call to be checked against
+    """
+    index: Dict[str, List[Any]] = defaultdict(list)
+    for other_module in modules:
+        owned: Dict[str, Optional[tuple]] = {}
+        for name in (other_module.name, *other_module.classes.keys()):
+            segment, dot, _ = name.partition('.')
+            if not dot:
+                owned[segment] = None
+            elif owned.get(segment, ()) is not None:
+                owned[segment] = (*owned.get(segment, ()), name + '.')
+        for segment, dotted_names in owned.items():
+            index[segment].append((other_module, dotted_names))
+    return index
+
 def generate_interaction_map(modules: List[ModuleInfo]) -> Dict[str, Any]:
     """Generate cross-module interaction map"""
     interactions = {}
+    prefix_index = _build_prefix_index(modules)
     
     for module in modules:
         module_interactions = []
         
         # Check all function calls for cross-module references
-        all_functions = list(module.functions.values())
-        for class_info in module.classes.values():
-            all_functions.extend(class_info.methods.values())
-            
-        for func in all_functions:
+        for func in module.all_callables():
             for call in func.calls:
-                # Check if call references other modules
-                for other_module in modules:
-                    if other_module.name != module.name:
-                        if (call.startswith(other_module.name + '.') or 
-                            any(call.startswith(cls + '.') for cls in other_module.classes.keys())):
-                            module_interactions.append({
-                                'from_function': func.name,
-                                'to_module': other_module.name,
-                                'call': call
-                            })
-                            
+                segment, dot, _ = call.partition('.')
+                if not dot:
+                    continue
+                # Only modules owning a name with the call's leading segment can match
+                for other_module, dotted_names in prefix_index.get(segment, ()):
+                    if other_module.name != module.name and (dotted_names is None or call.startswith(dotted_names)):
+                        module_interactions.append({
+                            'from_function': func.name,
+                            'to_module': other_module.name,
+                            'call': call
+                        })
+                        
         interactions[module.name] = module_interactions
         
     return interactions
 
 def format_module_summary(module: ModuleInfo) -> str:
     """Format a single module summary similar to the manual format"""
-    lines = [f"{module.name} - {module.docstring or 'No description'}", ""]
+    buf = io.StringIO()
+    write_module_summary(buf.write, module)
+    return buf.getvalue()
+
+def write_module_summary(write, module: ModuleInfo) -> None:
+    """Write a single module summary through write, each line after the first led by its newline"""
+    write(f"{module.name} - {module.docstring or 'No description'}\n")
     
     # Module state
     if module.module_variables:
-        lines.append("Module State:")
+        write("\nModule State:")
         for var in sorted(module.module_variables):
-            lines.append(f"  {var}")
-        lines.append("")
+            write(f"\n  {var}")
+        write("\n")
     
     # Functions
     if module.functions:
-        lines.append("Functions:")
+        write("\nFunctions:")
         for name, func in module.functions.items():
-            lines.append(f"  {name}()")
+            write(f"\n  {name}()")
             if func.calls:
-                lines.append(f"    @calls: {', '.join(sorted(func.calls))}")
+                write(f"\n    @calls: {func.calls_line}")
             if func.creates:
-                lines.append(f"    @creates: {', '.join(sorted(func.creates))}")
+                write(f"\n    @creates: {func.creates_line}")
             if func.returns:
-                lines.append(f"    @returns: {func.returns}")
-            lines.append("")
+                write(f"\n    @returns: {func.returns}")
+            write("\n")
     
     # Classes
     if module.classes:
-        lines.append("Classes:")
+        write("\nClasses:")
         for name, cls in module.classes.items():
             base_str = f"({', '.join(cls.bases)})" if cls.bases else ""
-            lines.append(f"  {name}{base_str}")
+            write(f"\n  {name}{base_str}")
             
             for method_name, method in cls.methods.items():
-                lines.append(f"    {method_name}()")
+                write(f"\n    {method_name}()")
                 if method.calls:
-                    lines.append(f"      @calls: {', '.join(sorted(method.calls))}")
+                    write(f"\n      @calls: {method.calls_line}")
                 if method.creates:
-                    lines.append(f"      @creates: {', '.join(sorted(method.creates))}")
-            lines.append("")
-    
-    return "\n".join(lines)
+                    write(f"\n      @creates: {method.creates_line}")
+            write("\n")
 
-def generate_unified_atlas(file_paths: List[str]) -> str:
-    """Generate a unified code atlas from multiple Python files"""
+def analyze_files(file_paths: List[str]) -> List[ModuleInfo]:
+    """Analyze every existing file once, in order, and return its module information"""
     modules = []
     
     print("Analyzing files...")
+    existing_paths = []
     for file_path in file_paths:
         if os.path.exists(file_path):
-            module = analyze_file(file_path)
-            modules.append(module)
-            print(f"✓ Analyzed {file_path}")
+            existing_paths.append(file_path)
         else:
             print(f"✗ File not found: {file_path}")
     
+    # Files are analyzed independently (in parallel for larger runs), kept in input order
+    analyze = partial(cached_analysis, analyze_file)
+    for file_path, module, error in run_per_file(analyze, existing_paths):
+        if error is not None:
+            print(f"Error analyzing {file_path}: {error}")
+            module = ModuleInfo(Path(file_path).stem, file_path)
+        modules.append(module)
+        print(f"✓ Analyzed {file_path}")
+    
+    return modules
+
+def generate_unified_atlas(file_paths: List[str], modules: Optional[List[ModuleInfo]] = None,
+                           interactions: Optional[Dict[str, Any]] = None) -> str:
+    """Generate a unified code atlas from multiple Python files
+    
+    Already-analyzed modules and their interaction map can be passed in so that
+    callers producing several outputs parse and walk each file only once.
+    """
+    buf = io.StringIO()
+    write_unified_atlas(buf.write, file_paths, modules, interactions)
+    return buf.getvalue()
+
+def write_unified_atlas(write, file_paths: List[str], modules: Optional[List[ModuleInfo]] = None,
+                        interactions: Optional[Dict[str, Any]] = None) -> None:
+    """Write the unified code atlas through write, e.g. straight into an open file"""
+    if modules is None:
+        modules = analyze_files(file_paths)
+    
     # Generate individual module summaries
-    atlas_lines = ["# Unified Code Atlas - Generated Analysis", ""]
+    write("# Unified Code Atlas - Generated Analysis\n")
     
     for module in modules:
-        atlas_lines.append("## " + "=" * 50)
-        atlas_lines.append(format_module_summary(module))
-        atlas_lines.append("")
+        write("\n## " + "=" * 50 + "\n")
+        write_module_summary(write, module)
+        write("\n")
     
     # Generate interaction map
-    interactions = generate_interaction_map(modules)
-    atlas_lines.append("## Cross-Module Interactions")
-    atlas_lines.append("")
+    if interactions is None:
+        interactions = generate_interaction_map(modules)
+    write("\n## Cross-Module Interactions\n")
     
     for module_name, module_interactions in interactions.items():
         if module_interactions:
-            atlas_lines.append(f"### {module_name} calls:")
+            write(f"\n### {module_name} calls:")
             for interaction in module_interactions:
-                atlas_lines.append(f"  {interaction['from_function']}() → {interaction['to_module']}.{interaction['call']}")
-            atlas_lines.append("")
-    
-    return "\n".join(atlas_lines)
+                write(f"\n  {interaction['from_function']}() → {interaction['to_module']}.{interaction['call']}")
+            write("\n")
+
+def _json_default(o):
+    """Encode sets as lists while the JSON is written, instead of copying each one up front"""
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
 
 def main():
     """Main entry point"""
@@ -305,47 +395,48 @@ def main():
         sys.exit(1)
     
     file_paths = sys.argv[1:]
-    atlas = generate_unified_atlas(file_paths)
+    # Each file is parsed and walked once; the atlas and the JSON share the results
+    modules = analyze_files(file_paths)
+    interactions = generate_interaction_map(modules)
     
-    # Write to file
+    # Write to file, streaming the atlas instead of building it in memory
     output_file = "generated_code_atlas.md"
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(atlas)
+        write_unified_atlas(f.write, file_paths, modules, interactions)
     
     print(f"\n✓ Code atlas generated: {output_file}")
     
     # Also save as JSON for programmatic use
-    modules = [analyze_file(fp) for fp in file_paths if os.path.exists(fp)]
     json_data = {
         'modules': [
             {
                 'name': m.name,
                 'file_path': m.file_path,
                 'functions': {name: {
-                    'calls': list(func.calls),
-                    'creates': list(func.creates),
+                    'calls': func.calls,
+                    'creates': func.creates,
                     'returns': func.returns,
                     'line_number': func.line_number
                 } for name, func in m.functions.items()},
                 'classes': {name: {
                     'methods': {mname: {
-                        'calls': list(method.calls),
-                        'creates': list(method.creates),
+                        'calls': method.calls,
+                        'creates': method.creates,
                         'line_number': method.line_number
                     } for mname, method in cls.methods.items()},
                     'bases': cls.bases,
                     'line_number': cls.line_number
                 } for name, cls in m.classes.items()},
-                'imports': list(m.imports),
-                'module_variables': list(m.module_variables)
+                'imports': m.imports,
+                'module_variables': m.module_variables
             } for m in modules
         ],
-        'interactions': generate_interaction_map(modules)
+        'interactions': interactions
     }
     
     json_file = "generated_code_atlas.json"
     with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, indent=2)
+        json.dump(json_data, f, indent=2, default=_json_default)
     
     print(f"✓ JSON data saved: {json_file}")
 
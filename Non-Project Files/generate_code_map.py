@@ -1,23 +1,85 @@
 import os
 import ast
 import json
+import functools
 
+from generator_common import cached_analysis, read_source, run_per_file
 
-class CodeVisitor(ast.NodeVisitor):
+# Fields that can hold statements (directly or via except handlers and match cases),
+# per node class, worked out once so the walker never inspects the other fields.
+# Expressions are left out: a Lambda or IfExp "body" is never a statement.
+_STATEMENT_FIELD_NAMES = ("body", "handlers", "orelse", "finalbody", "cases")
+
+
+def _all_node_classes(cls=ast.AST):
+    """
+    Yields every concrete and abstract AST node class below cls.
+    """
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _all_node_classes(subclass)
+
+
+STATEMENT_FIELDS = {
+    cls: tuple(f for f in cls._fields if f in _STATEMENT_FIELD_NAMES)
+    for cls in _all_node_classes()
+    if not issubclass(cls, (ast.expr, ast.Expression)) and any(f in _STATEMENT_FIELD_NAMES for f in cls._fields)
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _project_modules(cwd: str) -> frozenset:
+    """
+    Returns the names of the .py modules in the working directory, listed once per directory.
+    """
+    return frozenset(os.path.splitext(f)[0] for f in os.listdir(cwd) if f.endswith(".py"))
+
+
+class CodeVisitor:
     """
-    An AST visitor that extracts information about functions, classes, and imports.
+    An AST walker that extracts information about functions, classes, and imports.
     """
 
+    # Node types whose children hold nothing further to record
+    OPAQUE_NODES = (ast.Import, ast.ImportFrom, ast.ClassDef)
+
     def __init__(self, file_path):
         self.file_path = file_path
         self.imports = set()
         self.functions = []
         self.classes = []
+        self.project_modules = _project_modules(os.getcwd())
+        # Exact node type -> handler, replacing NodeVisitor's per-node getattr lookup
+        self.handlers = {
+            ast.Import: self.visit_Import,
+            ast.ImportFrom: self.visit_ImportFrom,
+            ast.FunctionDef: self.visit_FunctionDef,
+            ast.ClassDef: self.visit_ClassDef,
+        }
+
+    def visit(self, tree):
+        """
+        Walks the tree iteratively in source order, dispatching through the handler table.
+        Imports and definitions are statements, so only statement-bearing fields are followed.
+        """
+        handlers = self.handlers
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            node_type = type(node)
+            handler = handlers.get(node_type)
+            if handler is not None:
+                handler(node)
+                if node_type in self.OPAQUE_NODES:
+                    continue
+
+            # Pushed in reverse so they are popped, and recorded, in source order
+            for field in reversed(STATEMENT_FIELDS.get(node_type, ())):
+                stack.extend(reversed(getattr(node, field)))
 
     def visit_Import(self, node):
         for alias in node.names:
             self.imports.add(alias.name)
-        self.generic_visit(node)
 
     def visit_ImportFrom(self, node):
         # We only care about local project imports for the dependency map.
@@ -34,15 +96,13 @@ class CodeVisitor(ast.NodeVisitor):
             module_path = os.path.join(base_path, node.module).replace(os.sep, ".") if node.module else base_path.replace(os.sep, ".")
             self.imports.add(module_path)
         # We can also add non-relative imports if they are from our own project files
-        elif node.module and node.module.split(".")[0] in [os.path.splitext(f)[0] for f in os.listdir(".") if f.endswith(".py")]:
+        elif node.module and node.module.split(".")[0] in self.project_modules:
             self.imports.add(node.module)
 
-        self.generic_visit(node)
-
     def visit_FunctionDef(self, node):
         """Extracts information from a function definition."""
         self.functions.append({"name": node.name, "args": [arg.arg for arg in node.args.args], "docstring": ast.get_docstring(node)})
-        self.generic_visit(node)  # Visit nodes inside the function
+        # The walker then visits nodes inside the function
 
     def visit_ClassDef(self, node):
         """Extracts information from a class definition."""
@@ -51,36 +111,55 @@ class CodeVisitor(ast.NodeVisitor):
             if isinstance(item, ast.FunctionDef):
                 methods.append({"name": item.name, "args": [arg.arg for arg in item.args.args], "docstring": ast.get_docstring(item)})
         self.classes.append({"name": node.name, "methods": methods, "docstring": ast.get_docstring(node)})
-        # Don't call generic_visit on the class body to avoid double-counting methods as functions
-        # self.generic_visit(node)
+        # ClassDef is opaque to the walker, so methods are not double-counted as functions
 
 
-def parse_module(file_path: str) -> dict | None:
+def _parse_module_uncached(file_path: str) -> dict:
     """
     Parses a single Python file and returns a dictionary of its contents.
     """
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
+    content = read_source(file_path)
 
-        tree = ast.parse(content, filename=file_path)
+    tree = ast.parse(content, filename=file_path)
 
-        visitor = CodeVisitor(file_path)
-        visitor.visit(tree)
+    visitor = CodeVisitor(file_path)
+    visitor.visit(tree)
 
-        # Normalize paths for consistency
-        normalized_path = file_path.replace(os.sep, "/")
+    # Normalize paths for consistency
+    normalized_path = file_path.replace(os.sep, "/")
 
-        return {
-            "path": normalized_path,
-            "summary": ast.get_docstring(tree),
-            "imports": sorted(list(visitor.imports)),
-            "functions": visitor.functions,
-            "classes": visitor.classes,
-        }
-    except Exception as e:
-        print(f"Error parsing {file_path}: {e}")
-        return None
+    return {
+        "path": normalized_path,
+        "summary": ast.get_docstring(tree),
+        "imports": sorted(list(visitor.imports)),
+        "functions": visitor.functions,
+        "classes": visitor.classes,
+    }
+
+
+def _iter_py_files(root_dir: str, exclude_dirs: set):
+    """
+    Yields the .py files under root_dir in os.walk's top-down order, using one
+    scandir per directory so the DirEntry type information spares a stat per entry.
+    Like os.walk, symlinked directories are not descended into and unreadable
+    directories are skipped.
+    """
+    stack = [root_dir]
+    while stack:
+        dirpath = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if entry.name not in exclude_dirs and not entry.is_symlink():
+                            subdirs.append(entry.path)
+                    elif entry.name.endswith(".py"):
+                        yield entry.path
+        except OSError:
+            continue
+        # Pushed in reverse so subdirectories are walked in listing order
+        stack.extend(reversed(subdirs))
 
 
 def generate_map(root_dir: str, output_file: str):
@@ -92,16 +171,19 @@ def generate_map(root_dir: str, output_file: str):
     # Directories to exclude from the scan
     exclude_dirs = {".git", ".venv", "__pycache__", ".sandbox"}
 
-    for dirpath, dirnames, filenames in os.walk(root_dir):
-        # Modify dirnames in-place to prevent os.walk from descending into excluded dirs
-        dirnames[:] = [d for d in dirnames if d not in exclude_dirs]
+    file_paths = list(_iter_py_files(root_dir, exclude_dirs))
+
+    # Non-relative imports are matched against the .py files in the working directory,
+    # so cached modules are only reused while that set of modules is unchanged
+    project_modules = tuple(sorted(_project_modules(os.getcwd())))
+    parse_module = functools.partial(cached_analysis, _parse_module_uncached, extra_key=project_modules)
 
-        for filename in filenames:
-            if filename.endswith(".py"):
-                file_path = os.path.join(dirpath, filename)
-                module_data = parse_module(file_path)
-                if module_data:
-                    code_map["modules"].append(module_data)
+    # Parsing is CPU-bound and independent per file; results keep the walk order
+    for file_path, module_data, error in run_per_file(parse_module, file_paths):
+        if error is not None:
+            print(f"Error parsing {file_path}: {error}")
+        else:
+            code_map["modules"].append(module_data)
 
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(code_map, f, indent=2)
@@ -1,15 +1,24 @@
-import json
+import io
 import os
+import socket
 import time
 import subprocess
 import sys
 import threading
+import orjson
 import socketio
 from typing import List, Dict, Any
 
+# The ports come from the project's config so the readiness probes follow the real services
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import HAVEN_ADDRESS, SERVER_PORT
+
 # --- Configuration ---
 OUTPUT_DIR = "sdlc/trace_maps"
-APP_URL = "http://localhost:5001"
+APP_PORT = SERVER_PORT
+APP_URL = f"http://localhost:{APP_PORT}"
+HAVEN_PORT = HAVEN_ADDRESS[1]
+STARTUP_TIMEOUT = 30  # Seconds to wait for a service to accept connections
 
 # --- Scenario Definitions ---
 SCENARIOS = {
@@ -31,61 +40,85 @@ SCENARIOS = {
     }
 }
 
+def _wait_for_port(port: int, process: subprocess.Popen, service_name: str) -> bool:
+    """Polls until a local port accepts connections, the process exits, or the timeout passes."""
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline and process.poll() is None:
+        try:
+            socket.create_connection(("localhost", port), timeout=0.2).close()
+            return True
+        except OSError:
+            time.sleep(0.05)
+    print(f"Warning: {service_name} did not start accepting connections on port {port}.")
+    return False
+
+def _write_json(path: str, data: Any) -> None:
+    """Writes data as indented JSON, serialized by orjson straight to bytes."""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
 def _get_participants_from_trace(trace_log: List[Dict[str, Any]]) -> List[str]:
-    """Recursively finds all unique module participants in a trace log."""
+    """Finds all unique module participants in a trace log, walking nested calls with an explicit stack."""
     participants = set()
-    for entry in trace_log:
+    stack = list(trace_log)
+    while stack:
+        entry = stack.pop()
         if entry.get("type") == "EVENT":
             continue
         
-        module = entry.get("function", "").split('.')[0]
+        module = entry.get("function", "").partition('.')[0]
         if module:
             participants.add(module)
         
         if "nested_calls" in entry:
-            participants.update(_get_participants_from_trace(entry["nested_calls"]))
+            stack.extend(entry["nested_calls"])
     return sorted(list(participants))
 
-def _generate_mermaid_lines(trace_log: List[Dict[str, Any]], from_participant: str) -> List[str]:
-    """Recursively traverses the trace and generates Mermaid syntax lines."""
-    lines = []
-    for entry in trace_log:
+def _write_mermaid_lines(write, trace_log: List[Dict[str, Any]], from_participant: str) -> None:
+    """Traverses the trace with an explicit stack and writes Mermaid syntax lines."""
+    # Each item is either a finished line (a return arrow, due once the nested calls
+    # are out) or an entry to expand together with its caller
+    stack = [(None, entry, from_participant) for entry in reversed(trace_log)]
+    while stack:
+        line, entry, caller = stack.pop()
+        if line is not None:
+            write(line)
+            continue
+        
         if entry.get("type") == "EVENT":
-            lines.append(f"    note over {from_participant}: {entry.get('event_name', 'Unnamed Event')}")
+            write(f"    note over {caller}: {entry.get('event_name', 'Unnamed Event')}\n")
             continue
 
         full_func_name = entry.get("function", "unknown.function")
-        to_participant, func_name = full_func_name.split('.', 1)
+        # Traced names are always "module.qualname"; partition avoids split's list
+        to_participant, _, func_name = full_func_name.partition('.')
         
-        lines.append(f"    {from_participant}->>+{to_participant}: {func_name}()")
-        
-        if "nested_calls" in entry:
-            lines.extend(_generate_mermaid_lines(entry["nested_calls"], to_participant))
+        write(f"    {caller}->>+{to_participant}: {func_name}()\n")
         
         return_value = "exception" if "exception" in entry else "return_value"
-        lines.append(f"    {to_participant}-->>-{from_participant}: {return_value}")
+        stack.append((f"    {to_participant}-->>-{caller}: {return_value}\n", None, None))
         
-    return lines
+        if "nested_calls" in entry:
+            stack.extend((None, nested, to_participant) for nested in reversed(entry["nested_calls"]))
 
 def _generate_sequence_diagram(trace_log: List[Dict[str, Any]], scenario_name: str) -> str:
     """Generates a full Mermaid sequence diagram from a trace log."""
     participants = _get_participants_from_trace(trace_log)
     
-    mermaid_string = "```mermaid\n"
-    mermaid_string += "sequenceDiagram\n"
-    mermaid_string += "    autonumber\n"
-    mermaid_string += "    actor Client\n"
-    
+    buf = io.StringIO()
+    write = buf.write
+    write("```mermaid\nsequenceDiagram\n    autonumber\n    actor Client\n")
     for p in participants:
         if p != "Client":
-            mermaid_string += f"    participant {p}\n"
-            
-    mermaid_string += "\n"
+            write(f"    participant {p}\n")
+    write("\n")
     # The initial calls in the trace are from the Client to the first participant.
     first_participant = participants[0] if participants else "Server"
-    mermaid_string += "\n".join(_generate_mermaid_lines(trace_log, "Client"))
-    mermaid_string += "\n```"
-    return mermaid_string
+    _write_mermaid_lines(write, trace_log, "Client")
+    if not trace_log:
+        write("\n")  # An empty body still leaves its blank line before the closing fence
+    write("```")
+    return buf.getvalue()
 
 class ScenarioRunner:
     """
@@ -178,8 +211,7 @@ class ScenarioRunner:
             "description": scenario_config["description"],
             "trace": self.trace_log or "Trace log could not be retrieved."
         }
-        with open(json_path, "w") as f:
-            json.dump(output_data, f, indent=2)
+        _write_json(json_path, output_data)
         print(f"Trace map JSON saved to '{json_path}'")
 
         # --- Step 2: Generate and save the sequence diagram (additive) ---
@@ -201,8 +233,7 @@ class ScenarioRunner:
                 "description": scenario_config["description"],
                 "trace": self.haven_trace_log
             }
-            with open(haven_json_path, "w") as f:
-                json.dump(haven_output_data, f, indent=2)
+            _write_json(haven_json_path, haven_output_data)
             print(f"Haven trace map JSON saved to '{haven_json_path}'")
 
             # Save the Haven sequence diagram
@@ -224,16 +255,22 @@ def main():
         haven_process = None
         app_process = None
         try:
-            # Start Haven for the current scenario
+            # Start Haven and the Flask App together; the app retries its Haven
+            # connection, so the two start-ups overlap instead of running back to back
             print(f"\n--- [{name}] Starting Services ---")
             print("Starting Haven service...")
             haven_process = subprocess.Popen([sys.executable, "haven.py"])
-            time.sleep(5) # Wait for Haven to be ready
-
-            # Start the Flask App for the current scenario
             print("Starting Flask App service...")
             app_process = subprocess.Popen([sys.executable, "phoenix.py"])
-            time.sleep(5) # Wait for Flask app to be ready
+
+            # Wait until each service accepts connections rather than for a fixed time.
+            # The probes run one after the other, but both services are already starting,
+            # so the second probe only waits out whatever start-up time remains
+            if not (_wait_for_port(HAVEN_PORT, haven_process, "Haven")
+                    and _wait_for_port(APP_PORT, app_process, "Flask App")):
+                # A trace against a dead service would only record the failure; skip to teardown
+                print(f"Skipping scenario '{name}': services did not start.")
+                continue
 
             # Run the single scenario with the fresh services.
             runner = ScenarioRunner()
@@ -0,0 +1,129 @@
+"""
+Shared Helpers for the Code Map, Atlas and Call Tree Generators
+
+AST visitor base and per-file analysis plumbing used by claude_atlas_generator.py,
+claude_call_tree_generator.py, claude_code_map_generator.py and generate_code_map.py.
+"""
+
+import ast
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+# AST node types with no child nodes; generic_visit never needs to descend into them
+LEAF_NODE_TYPES = frozenset(
+    {ast.Name, ast.Constant, ast.alias, ast.Pass, ast.Break, ast.Continue, ast.Global, ast.Nonlocal}
+    | set(ast.expr_context.__subclasses__())
+    | set(ast.boolop.__subclasses__())
+    | set(ast.operator.__subclasses__())
+    | set(ast.unaryop.__subclasses__())
+    | set(ast.cmpop.__subclasses__())
+)
+
+class PrunedVisitor(ast.NodeVisitor):
+    """Base for the analyzers, which only react to nodes inside a function body.
+
+    Subclasses set self.current_function while visiting a function and leave
+    it None elsewhere.
+    """
+
+    def generic_visit(self, node: ast.AST) -> None:
+        """Visit child nodes, skipping leaves and, outside functions, whole expressions.
+
+        Calls are only recorded inside a function and no expression can contain a
+        function or class definition, so expression subtrees at module or class
+        level hold nothing the analyzers react to.
+        """
+        skip_expressions = self.current_function is None
+        for _, value in ast.iter_fields(node):
+            for child in (value if isinstance(value, list) else (value,)):
+                if (isinstance(child, ast.AST) and type(child) not in LEAF_NODE_TYPES
+                        and not (skip_expressions and isinstance(child, ast.expr))):
+                    self.visit(child)
+
+def node_docstring(node) -> Optional[str]:
+    """Return the node's docstring, skipping get_docstring when the body cannot start with one."""
+    body = node.body
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+        return ast.get_docstring(node)
+    return None
+
+def read_source(file_path: str) -> str:
+    """Read a whole source file with one os.read, skipping the buffered text-file layers.
+
+    Parsing the decoded text gives the same tree as reading it in text mode;
+    the tokenizer applies the same newline translation.
+    """
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        data = os.read(fd, size)
+        while len(data) < size:  # Short read; stop early if the file shrank meanwhile
+            chunk = os.read(fd, size - len(data))
+            if not chunk:
+                break
+            data += chunk
+    finally:
+        os.close(fd)
+    return data.decode('utf-8')
+
+# Per-file analysis results are pickled here, keyed by file identity and generator version
+CACHE_DIR = Path.home() / ".cache" / "phoenix_atlas"
+
+def cached_analysis(worker, file_path: str, extra_key: tuple = ()):
+    """Run worker on a file, reusing its pickled result while the file is unchanged.
+
+    The key covers the file's path, mtime and size plus the mtimes of the
+    worker's own script and of this module, so editing the analyzed file, the
+    generator or these helpers invalidates the entry. extra_key adds any other
+    state the worker's result depends on. Exceptions from worker are not cached.
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size,
+           worker.__module__, worker.__qualname__,
+           os.stat(worker.__code__.co_filename).st_mtime_ns, os.stat(__file__).st_mtime_ns, extra_key)
+    cache_path = CACHE_DIR / hashlib.sha1(repr(key).encode()).hexdigest()
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        pass  # Missing or unreadable entry: analyze the file
+
+    result = worker(file_path)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # Caching is best-effort
+    return result
+
+# Below this many files the process pool's start-up cost outweighs parallel parsing
+PARALLEL_MIN_FILES = 8
+
+def run_per_file(worker, file_paths: List[str]):
+    """Apply worker to each file, in a process pool when there are enough files.
+
+    Yields (file_path, result, error) in input order; a failure in one file is
+    reported through error and does not stop the others.
+    """
+    if len(file_paths) < PARALLEL_MIN_FILES:
+        for file_path in file_paths:
+            try:
+                yield file_path, worker(file_path), None
+            except Exception as e:
+                yield file_path, None, e
+        return
+
+    with ProcessPoolExecutor() as executor:
+        futures = [executor.submit(worker, file_path) for file_path in file_paths]
+        for file_path, future in zip(file_paths, futures):
+            try:
+                yield file_path, future.result(), None
+            except Exception as e:
+                yield file_path, None, e
@@ -1,21 +1,58 @@
+import atexit
 import csv
 import os
 from datetime import datetime
 import threading
-import json
+import eventlet
+import orjson
+from config import AUDIT_LOG_ENABLED, AUDIT_FLUSH_INTERVAL_SECONDS, AUDIT_FLUSH_MAX_EVENTS
+
+
+def _dumps(value):
+    """Compact JSON for a CSV cell; orjson keeps per-event logging cheap."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+# Socket.IO room that audit viewers join to receive 'audit_batch' broadcasts.
+AUDIT_ROOM = "audit_subscribers"
 
 
 class AuditLogger:
     def __init__(self, filename="audit_trail.csv"):
         self.filepath = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".sandbox", filename)
         self.lock = threading.Lock()
+        self.enabled = AUDIT_LOG_ENABLED
         self._initialize_file()
         # Add a placeholder for the socketio object
         self.socketio = None
+        # Events waiting for the next flush, as CSV rows and as broadcast payloads.
+        self._pending_rows = []
+        self._pending_broadcasts = []
+        self._flusher = None
+        # Socket.IO session IDs of the clients in AUDIT_ROOM. While it is empty,
+        # events are only written to disk and no broadcast payload is built.
+        self._subscribers = set()
+        atexit.register(self.stop)
 
     def register_socketio(self, sio):
-        """Allows the main app to register the Socket.IO instance."""
+        """
+        Allows the main app to register the Socket.IO instance and starts the
+        periodic flusher on the caller's eventlet hub. Called once at startup.
+        """
         self.socketio = sio
+        with self.lock:
+            if self._flusher is None:
+                self._flusher = eventlet.spawn(self._flush_periodically)
+
+    def add_subscriber(self, sid):
+        """Records a client that has joined AUDIT_ROOM to watch audit events."""
+        with self.lock:
+            self._subscribers.add(sid)
+
+    def remove_subscriber(self, sid):
+        """Forgets a client that has disconnected; unknown IDs are ignored."""
+        with self.lock:
+            self._subscribers.discard(sid)
 
     def _initialize_file(self):
         """Creates the CSV file and writes the header if it doesn't exist."""
@@ -51,18 +88,22 @@ class AuditLogger:
         control_flow=None,
     ):
         """
-        Logs a new event to the CSV file and broadcasts it over Socket.IO.
+        Queues a new event for the CSV file and the Socket.IO broadcast; both
+        happen on the next flush. Does nothing when auditing is disabled.
         """
+        if not self.enabled:
+            return
+
         timestamp = datetime.now().isoformat()
 
-        details_str = json.dumps(details) if details is not None else ""
+        details_str = _dumps(details) if details is not None else ""
         observer_str = ", ".join(observers) if isinstance(observers, list) else (observers or "N/A")
 
         def serialize(value):
             if value is None:
                 return ""
             if isinstance(value, (dict, list)):
-                return json.dumps(value)
+                return _dumps(value)
             return str(value)
 
         log_data_for_csv = [
@@ -78,23 +119,53 @@ class AuditLogger:
         ]
 
         with self.lock:
-            # Write to CSV file
-            with open(self.filepath, "a", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f, quoting=csv.QUOTE_ALL)
-                writer.writerow(log_data_for_csv)
-
-            # NEW: Broadcast the event over Socket.IO if available
-            if self.socketio:
-                log_data_for_broadcast = {
-                    "event": event,
-                    "source": source,
-                    "destination": destination,
-                    "session_id": session_id,
-                    "loop_id": loop_id,
-                    "details": details,
-                }
-                # Use a separate thread to avoid blocking
-                self.socketio.start_background_task(self.socketio.emit, "new_audit_event", log_data_for_broadcast)
+            self._pending_rows.append(log_data_for_csv)
+            if self.socketio and self._subscribers:
+                self._pending_broadcasts.append(
+                    {
+                        "event": event,
+                        "source": source,
+                        "destination": destination,
+                        "session_id": session_id,
+                        "loop_id": loop_id,
+                        "details": details,
+                    }
+                )
+            batch_full = len(self._pending_rows) >= AUDIT_FLUSH_MAX_EVENTS
+
+        if batch_full:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes all pending events to the CSV file in one append and broadcasts
+        them to AUDIT_ROOM as a single 'audit_batch' message.
+        """
+        with self.lock:
+            rows, self._pending_rows = self._pending_rows, []
+            broadcasts, self._pending_broadcasts = self._pending_broadcasts, []
+            if rows:
+                with open(self.filepath, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+                    writer.writerows(rows)
+
+        if broadcasts and self.socketio:
+            # Use a separate thread to avoid blocking
+            self.socketio.start_background_task(self.socketio.emit, "audit_batch", broadcasts, to=AUDIT_ROOM)
+
+    def stop(self):
+        """Stops the periodic flusher, then writes out whatever is still pending."""
+        with self.lock:
+            flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            flusher.kill()
+        self.flush()
+
+    def _flush_periodically(self):
+        """Flushes pending events every AUDIT_FLUSH_INTERVAL_SECONDS until stop() is called."""
+        while True:
+            eventlet.sleep(AUDIT_FLUSH_INTERVAL_SECONDS)
+            self.flush()
 
 
 # Create a single, global instance to be used by the entire application
@@ -7,6 +7,23 @@ SUMMARIZER_MODEL_NAME = "gemini-2.0-flash-lite-001"
 SEGMENT_THRESHOLD = 20
 ABSOLUTE_MAX_ITERATIONS_REASONING_LOOP = 10
 NOMINAL_MAX_ITERATIONS_REASONING_LOOP = 3
+# Number of replayed history events coalesced into a single 'replay_batch' emit.
+REPLAY_BATCH_SIZE = 50
+# When False, audit events are dropped before their details are built or written.
+AUDIT_LOG_ENABLED = True
+# Audit events are buffered and written (and broadcast) together, at this interval or once this many are pending.
+AUDIT_FLUSH_INTERVAL_SECONDS = 0.1
+AUDIT_FLUSH_MAX_EVENTS = 64
+# How long the database viewer reuses a collection list, and a single collection's data, before re-querying ChromaDB.
+DB_VIEWER_COLLECTIONS_TTL_SECONDS = 2
+DB_VIEWER_DATA_TTL_SECONDS = 5
+# Lifetime of Haven's server-side cache of the system prompt, and how often it is extended.
+SYSTEM_PROMPT_CACHE_TTL_MINUTES = 60
+SYSTEM_PROMPT_CACHE_REFRESH_MINUTES = 45
+# Number of prompts whose first read-only tool call is remembered for speculative execution.
+PLAN_CACHE_MAX_ENTRIES = 256
+# Largest file the file tools will read; bigger files are refused before being loaded or sent to the model.
+MAX_READ_FILE_BYTES = 256 * 1024
 
 ALLOWED_PROJECT_FILES = [
     "public_data/system_prompt.txt",
@@ -51,6 +68,8 @@ CHROMA_DB_PATH = os.path.join(os.path.dirname(__file__), ".sandbox", "chroma_db"
 
 # Server configuration
 SERVER_PORT = 5001
+# How long browsers may reuse served pages and assets before revalidating them with the server.
+STATIC_MAX_AGE_SECONDS = 300
 
 # Haven service connection details
 HAVEN_ADDRESS = ("localhost", 50000)
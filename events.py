@@ -12,92 +12,172 @@ which maps client session IDs to their corresponding ActiveSession objects.
 """
 
 import logging
+import time
+from eventlet import tpool
 from flask import request
-from flask_socketio import SocketIO
+from flask_socketio import SocketIO, join_room
 import json
-from typing import Dict, Any, List
+import orjson
+from typing import Dict, Any, Iterator, List
 
-from audit_logger import audit_log
+from audit_logger import audit_log, AUDIT_ROOM
+from config import REPLAY_BATCH_SIZE, DB_VIEWER_COLLECTIONS_TTL_SECONDS, DB_VIEWER_DATA_TTL_SECONDS
 import inspect_db as db_inspector
 from data_models import ToolCommand, ToolResult
 from session_models import ActiveSession
 from memory_manager import MemoryManager
-from orchestrator import execute_reasoning_loop, confirmation_events
+from orchestrator import execute_reasoning_loop
 from proxies import HavenProxyWrapper
 from tool_agent import execute_tool_command
 from utils import get_timestamp
 from response_parser import parse_agent_response, _handle_payloads
 from tracer import trace, global_tracer
 
+# --- Replay prefixes ---
+# Prefixes marking user-role history items that are tool results or
+# confirmation replies rather than messages typed by the user.
+_TOOL_RESULT_PREFIXES = ("TOOL_RESULT:", "OBSERVATION:", "Tool Result:")
+_USER_CONFIRMATION_PREFIX = "USER_CONFIRMATION:"
+
 # --- Module-level state ---
 # This dictionary holds the state for all active user connections, mapping a
 # temporary SocketIO session ID to a persistent ActiveSession object.
 chat_sessions: dict[str, ActiveSession] = {}
 # A global reference to the haven_proxy object initialized in phoenix.py.
 _haven_proxy = None
+# Recent database viewer responses, keyed by query, as (monotonic time, JSON string).
+_db_viewer_cache: Dict[tuple, tuple[float, str]] = {}
+
+@trace
+def _cached_db_query(key: tuple, ttl: float, query, *args) -> str:
+    """
+    Returns the JSON from a db_inspector query, reusing a response younger than
+    `ttl` seconds. Fresh queries run in tpool so ChromaDB never blocks the hub.
+    """
+    cached = _db_viewer_cache.get(key)
+    if cached and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    result = tpool.execute(query, *args)
+    _db_viewer_cache[key] = (time.monotonic(), result)
+    return result
+
+@trace
+def _emit_replay_batch(socketio: SocketIO, session_id: str, batch: List[Dict[str, Any]]) -> None:
+    """
+    Sends a batch of replayed history events to the client in a single emit.
+
+    Each entry is a {"event": ..., "data": ...} dictionary that the client
+    dispatches exactly as if the event had been emitted on its own.
+    """
+    if batch:
+        socketio.emit("replay_batch", batch, to=session_id)
+        socketio.sleep(0)
+
+@trace
+def emit_session_list_update(socketio: SocketIO, session_id: str, tool_result: ToolResult) -> None:
+    """
+    Sends a 'list_sessions' result to the client unless it is identical to the
+    list that client was last sent.
+    """
+    payload = tool_result.model_dump()
+    if session_data := chat_sessions.get(session_id):
+        if session_data.last_session_list == payload:
+            return
+        session_data.last_session_list = payload
+    socketio.emit("session_list_update", payload, to=session_id)
+
+@trace
+def _replay_events(history: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily translates raw chat history into client rendering events.
+
+    Each yielded entry is a {"event": ..., "data": ...} dictionary describing
+    one emit, so the caller decides how the events are grouped and sent.
+    """
+    for item in history:
+        role = item.get("role")
+        part = item["parts"][0] if "parts" in item else None
+        raw_text = part.get("text", "") if part else ""
+        if not raw_text or not raw_text.strip():
+            continue
+        if role == "user":
+            is_tool_result = False
+            # Handle different formats for tool results that might be in history.
+            if raw_text.startswith(_TOOL_RESULT_PREFIXES):
+                try:
+                    # A single partition finds the JSON object; orjson's decode error
+                    # subclasses json.JSONDecodeError, so the handler below still applies.
+                    _, brace, json_tail = raw_text.partition("{")
+                    tool_result = ToolResult.model_validate(orjson.loads(brace + json_tail))
+                    yield {"event": "tool_log", "data": {"data": f"[{tool_result.message}]"}}
+                    is_tool_result = True
+                except (json.JSONDecodeError, IndexError):
+                    yield {"event": "tool_log", "data": {"data": f"[{raw_text}]"}}
+                    is_tool_result = True
+            # Only text that opens a JSON object can be a bare tool result, so typed
+            # messages skip the parse attempt (and its exception) entirely.
+            if not is_tool_result and raw_text.lstrip().startswith("{"):
+                try:
+                    tool_result_dict = orjson.loads(raw_text)
+                    if isinstance(tool_result_dict, dict) and "status" in tool_result_dict:
+                        tool_result = ToolResult.model_validate(tool_result_dict)
+                        yield {"event": "tool_log", "data": {"data": f"[{tool_result.message}]"}}
+                        is_tool_result = True
+                except (json.JSONDecodeError, TypeError):
+                    pass # Not a pure JSON object, treat as a regular message.
+            if is_tool_result:
+                continue
+            if not raw_text.startswith(_USER_CONFIRMATION_PREFIX):
+                yield {"event": "log_message", "data": {"type": "user", "data": raw_text}}
+        elif role == "model":
+            # Use the consistent ParsedAgentResponse object.
+            parsed = parse_agent_response(raw_text)
+            if parsed.is_prose_empty:
+                continue
+            command = parsed.command
+            action = command.action if command else None
+            cleaned_prose, _ = _handle_payloads(parsed.prose, command)
+            final_message = ""
+            # Determine what to display based on the command and cleaned prose.
+            if action in ["respond", "task_complete"]:
+                response_param = command.parameters.get("response", "")
+                final_message = response_param if len(response_param) > len(cleaned_prose or "") else cleaned_prose
+            elif cleaned_prose:
+                final_message = cleaned_prose
+            # Render the messages based on the processed data.
+            if final_message:
+                yield {"event": "log_message", "data": {"type": "final_answer", "data": final_message}}
+            elif cleaned_prose: # This handles cases where prose is an intro to a command.
+                yield {"event": "log_message", "data": {"type": "info", "data": cleaned_prose}}
+            if action == "request_confirmation":
+                prompt = command.parameters.get("prompt", "Are you sure?")
+                yield {"event": "log_message", "data": {"type": "system_confirm_replayed", "data": prompt}}
 
 @trace
 def replay_history_for_client(socketio: SocketIO, session_id: str, session_name: str, history: List[Dict[str, Any]]) -> None:
     """
     Parses raw chat history and emits granular rendering events to the client.
     This allows a saved session to be loaded and displayed correctly.
+
+    Events are streamed from _replay_events and coalesced into 'replay_batch'
+    emits of up to REPLAY_BATCH_SIZE entries, yielding to other greenlets
+    once per batch rather than sleeping after every turn.
     """
+    batch: List[Dict[str, Any]] = []
     try:
+        # Socket.IO delivers a client's events in order and the client clears
+        # synchronously, so the first batch can follow the clear immediately.
         socketio.emit("clear_chat_history", to=session_id)
-        socketio.sleep(0.1)
-        for item in history:
-            role = item.get("role")
-            raw_text = (item.get("parts", [{}])[0] or {}).get("text", "")
-            if not raw_text or not raw_text.strip():
-                continue
-            if role == "user":
-                is_tool_result = False
-                # Handle different formats for tool results that might be in history.
-                if raw_text.startswith(("TOOL_RESULT:", "OBSERVATION:", "Tool Result:")):
-                    try:
-                        tool_result = ToolResult.model_validate(json.loads(raw_text[raw_text.find("{") :]))
-                        socketio.emit("tool_log", {"data": f"[{tool_result.message}]"}, to=session_id)
-                        is_tool_result = True
-                    except (json.JSONDecodeError, IndexError):
-                        socketio.emit("tool_log", {"data": f"[{raw_text}]"}, to=session_id)
-                        is_tool_result = True
-                if not is_tool_result:
-                    try:
-                        tool_result_dict = json.loads(raw_text)
-                        if isinstance(tool_result_dict, dict) and "status" in tool_result_dict:
-                            tool_result = ToolResult.model_validate(tool_result_dict)
-                            socketio.emit("tool_log", {"data": f"[{tool_result.message}]"}, to=session_id)
-                            is_tool_result = True
-                    except (json.JSONDecodeError, TypeError):
-                        pass # Not a pure JSON object, treat as a regular message.
-                if is_tool_result:
-                    continue
-                if not raw_text.startswith("USER_CONFIRMATION:"):
-                    socketio.emit("log_message", {"type": "user", "data": raw_text}, to=session_id)
-            elif role == "model":
-                # Use the consistent ParsedAgentResponse object.
-                parsed = parse_agent_response(raw_text)
-                if parsed.is_prose_empty:
-                    continue
-                cleaned_prose, _ = _handle_payloads(parsed.prose, parsed.command)
-                final_message = ""
-                # Determine what to display based on the command and cleaned prose.
-                if parsed.command and parsed.command.action in ["respond", "task_complete"]:
-                    response_param = parsed.command.parameters.get("response", "")
-                    final_message = response_param if len(response_param) > len(cleaned_prose or "") else cleaned_prose
-                elif cleaned_prose:
-                    final_message = cleaned_prose
-                # Render the messages based on the processed data.
-                if final_message:
-                    socketio.emit("log_message", {"type": "final_answer", "data": final_message}, to=session_id)
-                elif cleaned_prose: # This handles cases where prose is an intro to a command.
-                    socketio.emit("log_message", {"type": "info", "data": cleaned_prose}, to=session_id)
-                if parsed.command and parsed.command.action == "request_confirmation":
-                    prompt = parsed.command.parameters.get("prompt", "Are you sure?")
-                    socketio.emit("log_message", {"type": "system_confirm_replayed", "data": prompt}, to=session_id)
-            socketio.sleep(0.01)
+        for event in _replay_events(history):
+            batch.append(event)
+            if len(batch) >= REPLAY_BATCH_SIZE:
+                _emit_replay_batch(socketio, session_id, batch)
+                batch = []
+        _emit_replay_batch(socketio, session_id, batch)
     except Exception as e:
         logging.error(f"Error during history replay for session {session_name}: {e}")
+        # Deliver whatever was rendered before the failure, then report it.
+        _emit_replay_batch(socketio, session_id, batch)
         socketio.emit("log_message", {"type": "error", "data": f"Failed to replay history: {e}"}, to=session_id)
 
 @trace
@@ -119,17 +199,32 @@ def _create_new_session(session_id: str, proxy: object) -> ActiveSession:
     logging.info(f"Creating new session '{new_session_name}' for client {session_id}.")
     
     # Create a live session in the Haven service to hold the model's chat history.
-    proxy.get_or_create_session(new_session_name, [])
+    # Haven calls block on a socket, so they run on a real thread to keep the hub serving other clients.
+    tpool.execute(proxy.get_or_create_session, new_session_name, [])
     logging.info(f"Live session '{new_session_name}' created or confirmed in Haven.")
 
     # Construct the local ActiveSession object that holds the session's state.
+    # The memory manager opens and reads ChromaDB collections, so it is built in tpool too.
     session_data = ActiveSession(
         chat=HavenProxyWrapper(proxy, new_session_name),
-        memory=MemoryManager(session_name=new_session_name),
+        memory=tpool.execute(MemoryManager, session_name=new_session_name),
         name=new_session_name,
     )
     return session_data
 
+@trace
+def _log_client_audit_event(data: dict, session_id: str, session_name: str) -> None:
+    """Records one audit event reported by a client against its session."""
+    audit_log.log_event(
+        event=data.get("event"),
+        session_id=session_id,
+        session_name=session_name,
+        source=data.get("source"),
+        destination=data.get("destination"),
+        details=data.get("details"),
+        control_flow=data.get("control_flow"),
+    )
+
 @trace
 def register_events(socketio: SocketIO, haven_proxy: object):
     """
@@ -140,6 +235,7 @@ def register_events(socketio: SocketIO, haven_proxy: object):
     """
     global _haven_proxy
     _haven_proxy = haven_proxy
+    audit_log.register_socketio(socketio)
 
     @socketio.on("connect")
     @trace
@@ -175,12 +271,10 @@ def register_events(socketio: SocketIO, haven_proxy: object):
     def handle_disconnect(auth=None) -> None:
         """Handles client disconnection by cleaning up session data."""
         session_id = request.sid
-        if session_id in chat_sessions:
-            session_name = chat_sessions[session_id].name
-            logging.info(f"Client disconnected: {session_id}, Session: {session_name}")
-            # Clean up the session state to prevent memory leaks.
-            chat_sessions.pop(session_id, None)
-            confirmation_events.pop(session_id, None)
+        audit_log.remove_subscriber(session_id)
+        # Clean up the session state to prevent memory leaks.
+        if session_data := chat_sessions.pop(session_id, None):
+            logging.info(f"Client disconnected: {session_id}, Session: {session_data.name}")
 
     @socketio.on("start_task")
     @trace
@@ -218,7 +312,7 @@ def register_events(socketio: SocketIO, haven_proxy: object):
             ToolCommand(action="list_sessions"),
             socketio, session_id, chat_sessions, _haven_proxy
         )
-        socketio.emit("session_list_update", tool_result.model_dump(), to=session_id)
+        emit_session_list_update(socketio, session_id, tool_result)
 
     @socketio.on("request_session_name")
     @trace
@@ -233,7 +327,9 @@ def register_events(socketio: SocketIO, haven_proxy: object):
     def handle_db_collections_request(auth=None) -> None:
         """Forwards a request for DB collections to the db_inspector."""
         session_id = request.sid
-        collections_json = db_inspector.list_collections_as_json()
+        collections_json = _cached_db_query(
+            ("collections",), DB_VIEWER_COLLECTIONS_TTL_SECONDS, db_inspector.list_collections_as_json
+        )
         socketio.emit("db_collections_list", collections_json, to=session_id)
 
     @socketio.on("request_db_collection_data")
@@ -242,17 +338,28 @@ def register_events(socketio: SocketIO, haven_proxy: object):
         """Forwards a request for specific collection data to the db_inspector."""
         session_id = request.sid
         if collection_name := data.get("collection_name"):
-            collection_data_json = db_inspector.get_collection_data_as_json(collection_name)
+            collection_data_json = _cached_db_query(
+                ("data", collection_name), DB_VIEWER_DATA_TTL_SECONDS,
+                db_inspector.get_collection_data_as_json, collection_name,
+            )
             socketio.emit("db_collection_data", collection_data_json, to=session_id)
 
     @socketio.on("user_confirmation")
     @trace
     def handle_user_confirmation(data: dict) -> None:
         """Receives a 'yes' or 'no' from the user and forwards it to a waiting event."""
-        session_id = request.sid
-        if event := confirmation_events.get(session_id):
+        session_data = chat_sessions.get(request.sid)
+        if session_data and (event := session_data.confirmation_event):
             event.send(data.get("response"))
 
+    @socketio.on("subscribe_audit")
+    @trace
+    def handle_subscribe_audit(data=None) -> None:
+        """Adds the client to the room that receives live audit event broadcasts."""
+        session_id = request.sid
+        join_room(AUDIT_ROOM)
+        audit_log.add_subscriber(session_id)
+
     @socketio.on("log_audit_event")
     @trace
     def handle_audit_log(data: dict) -> None:
@@ -261,15 +368,18 @@ def register_events(socketio: SocketIO, haven_proxy: object):
         session_data = chat_sessions.get(session_id)
         session_name = session_data.name if session_data else "N/A"
 
-        audit_log.log_event(
-            event=data.get("event"),
-            session_id=session_id,
-            session_name=session_name,
-            source=data.get("source"),
-            destination=data.get("destination"),
-            details=data.get("details"),
-            control_flow=data.get("control_flow"),
-        )
+        _log_client_audit_event(data, session_id, session_name)
+
+    @socketio.on("log_audit_events")
+    @trace
+    def handle_audit_log_batch(data: dict) -> None:
+        """Receives a batch of audit log events that the client sent in one message."""
+        session_id = request.sid
+        session_data = chat_sessions.get(session_id)
+        session_name = session_data.name if session_data else "N/A"
+
+        for event_data in data.get("events", []):
+            _log_client_audit_event(event_data, session_id, session_name)
 
 
     @socketio.on('get_trace_log')
@@ -294,5 +404,5 @@ def register_events(socketio: SocketIO, haven_proxy: object):
         logging.info("Received request to get Haven trace log.")
         session_id = request.sid
         if _haven_proxy:
-            haven_trace_log = _haven_proxy.get_trace_log()
+            haven_trace_log = tpool.execute(_haven_proxy.get_trace_log)
             socketio.emit("haven_trace_log_response", {"trace": haven_trace_log}, to=session_id)
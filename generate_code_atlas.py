@@ -187,15 +187,15 @@ def refine_atlas_with_passed_args(atlas: Dict[str, Any]) -> Dict[str, Any]:
 
 def generate_atlas(project_dir: str) -> None:
     full_atlas: Dict[str, Any] = {}
-    for filename in os.listdir(project_dir):
-        if os.path.isfile(os.path.join(project_dir, filename)) and filename.endswith(".py"):
-            filepath = os.path.join(project_dir, filename)
-            print(f"Analyzing: {filename}")
-            try:
-                analyzer = CodeAnalyzer(filepath)
-                full_atlas[filename] = analyzer.analyze()
-            except Exception as e:
-                print(f"  ERROR analyzing {filename}: {e}")
+    with os.scandir(project_dir) as entries:
+        py_files = [(entry.name, entry.path) for entry in entries if entry.name.endswith(".py") and entry.is_file()]
+    for filename, filepath in py_files:
+        print(f"Analyzing: {filename}")
+        try:
+            analyzer = CodeAnalyzer(filepath)
+            full_atlas[filename] = analyzer.analyze()
+        except Exception as e:
+            print(f"  ERROR analyzing {filename}: {e}")
 
     print("\nRefining atlas for passed-as-argument calls...")
     refined_atlas = refine_atlas_with_passed_args(full_atlas)
@@ -9,14 +9,30 @@ The core state is managed in the module-level 'live_chat_sessions' dictionary.
 The main app connects to this service to send prompts and receive responses.
 """
 from multiprocessing.managers import BaseManager
+import atexit
+import datetime
 import logging
 import os
+import threading
 from typing import Any, List, Optional
 import vertexai
 from vertexai.generative_models import GenerativeModel, Content, Part
-from config import PROJECT_ID, LOCATION, SAFETY_SETTINGS
+from vertexai.preview import caching
+from vertexai.preview.generative_models import GenerativeModel as CachedGenerativeModel
+from config import (
+    HAVEN_ADDRESS,
+    HAVEN_AUTH_KEY,
+    PROJECT_ID,
+    LOCATION,
+    SAFETY_SETTINGS,
+    SYSTEM_PROMPT_CACHE_TTL_MINUTES,
+    SYSTEM_PROMPT_CACHE_REFRESH_MINUTES,
+)
 from tracer import trace, global_tracer
 
+# Directory holding the system prompt and model definition files.
+PUBLIC_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public_data")
+
 @trace
 def configure_logging() -> None:
     """
@@ -28,7 +44,7 @@ def configure_logging() -> None:
 def load_system_prompt() -> str:
     """Loads the system prompt text from the 'system_prompt.txt' file."""
     try:
-        prompt_path = os.path.join(os.path.dirname(__file__), "public_data", "system_prompt.txt")
+        prompt_path = os.path.join(PUBLIC_DATA_DIR, "system_prompt.txt")
         with open(prompt_path, "r") as f:
             return f.read()
     except FileNotFoundError:
@@ -38,12 +54,66 @@ def load_system_prompt() -> str:
 def load_model_definition() -> str:
     """Loads the model name from the 'model_definition.txt' file."""
     try:
-        model_definition_path = os.path.join(os.path.dirname(__file__), "public_data", "model_definition.txt")
+        model_definition_path = os.path.join(PUBLIC_DATA_DIR, "model_definition.txt")
         with open(model_definition_path, "r") as f:
             return f.read().strip()
     except FileNotFoundError:
         return "gemini-1.5-pro-001"
 
+@trace
+def create_cached_model(model_name: str, system_prompt: str) -> Optional[GenerativeModel]:
+    """
+    Creates a model whose system prompt lives in a server-side context cache.
+
+    Every generate_content call then reuses the cached prefix instead of sending
+    and prefilling the full system prompt again. A background thread keeps the
+    cache alive for as long as Haven runs, and the cache is deleted on exit.
+
+    Args:
+        model_name: The Vertex AI model to cache the prompt for.
+        system_prompt: The static system instruction shared by every session.
+
+    Returns:
+        The cache-backed model, or None if the cache could not be created (for
+        example, a prompt below the model's minimum cacheable size), in which case
+        the caller falls back to a regular model.
+    """
+    try:
+        cached_content = caching.CachedContent.create(
+            model_name=model_name,
+            system_instruction=system_prompt,
+            ttl=datetime.timedelta(minutes=SYSTEM_PROMPT_CACHE_TTL_MINUTES),
+        )
+    except Exception as e:
+        logging.info(f"Haven: System prompt caching unavailable, sending it with each request. Reason: {e}")
+        return None
+
+    threading.Thread(target=keep_cache_alive, args=(cached_content,), daemon=True).start()
+    atexit.register(release_cached_content, cached_content)
+    logging.info(f"Haven: System prompt cached as '{cached_content.name}'.")
+    return CachedGenerativeModel.from_cached_content(cached_content=cached_content, safety_settings=SAFETY_SETTINGS)
+
+# Not traced: it runs for the life of the process on its own thread, and an
+# unfinished trace entry would swallow every later call into its nesting.
+def keep_cache_alive(cached_content: caching.CachedContent) -> None:
+    """Periodically extends the system prompt cache's TTL so it never expires under a live Haven."""
+    refresh_interval = SYSTEM_PROMPT_CACHE_REFRESH_MINUTES * 60
+    while not stop_cache_refresh.wait(refresh_interval):
+        try:
+            cached_content.update(ttl=datetime.timedelta(minutes=SYSTEM_PROMPT_CACHE_TTL_MINUTES))
+        except Exception as e:
+            logging.error(f"Haven: Failed to extend the system prompt cache TTL: {e}")
+
+@trace
+def release_cached_content(cached_content: caching.CachedContent) -> None:
+    """Stops the TTL refresh thread and deletes the system prompt cache when Haven shuts down."""
+    stop_cache_refresh.set()
+    try:
+        cached_content.delete()
+        logging.info(f"Haven: Deleted system prompt cache '{cached_content.name}'.")
+    except Exception as e:
+        logging.warning(f"Haven: Failed to delete the system prompt cache: {e}")
+
 @trace
 def initialize_model() -> Optional[GenerativeModel]:
     """
@@ -56,17 +126,25 @@ def initialize_model() -> Optional[GenerativeModel]:
     """
     try:
         vertexai.init(project=PROJECT_ID, location=LOCATION)
-        model = GenerativeModel(
-            model_name=load_model_definition(),
-            system_instruction=[load_system_prompt()],
-            safety_settings=SAFETY_SETTINGS,
-        )
+        model_name = load_model_definition()
+        system_prompt = load_system_prompt()
+        model = create_cached_model(model_name, system_prompt)
+        if model is None:
+            model = GenerativeModel(
+                model_name=model_name,
+                system_instruction=[system_prompt],
+                safety_settings=SAFETY_SETTINGS,
+            )
         logging.info(f"Haven: Vertex AI configured successfully for project '{PROJECT_ID}'.")
         return model
     except Exception as e:
         logging.critical(f"Haven: FATAL: Failed to configure Vertex AI. Error: {e}")
         return None
 
+# Set by release_cached_content on shutdown to stop the thread that keeps the
+# system prompt cache alive.
+stop_cache_refresh = threading.Event()
+
 # --- Bootstrap Sequence ---
 configure_logging()
 model = initialize_model()
@@ -188,8 +266,8 @@ def start_haven() -> None:
     haven_instance = Haven()
     # Register the Haven class with the manager, allowing remote access.
     HavenManager.register("get_haven", lambda: haven_instance)
-    manager = HavenManager(address=("", 50000), authkey=b"phoenixhaven")
-    logging.info("Haven server started. Serving the persistent Haven object on port 50000.")
+    manager = HavenManager(address=("", HAVEN_ADDRESS[1]), authkey=HAVEN_AUTH_KEY)
+    logging.info(f"Haven server started. Serving the persistent Haven object on port {HAVEN_ADDRESS[1]}.")
     server = manager.get_server()
     # This starts the server loop, making it wait for connections indefinitely.
     server.serve_forever()
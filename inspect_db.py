@@ -12,21 +12,26 @@ web page and the standalone CLI tool.
 import chromadb
 import os
 import pandas as pd
-import json
+import orjson
 from datetime import datetime
 from tracer import trace
 from typing import Any
 
-from memory_manager import ChromaDBStore
+from memory_manager import ChromaDBStore, get_chroma_client
 from config import CHROMA_DB_PATH
 
+@trace
+def _to_json(payload: dict) -> str:
+    """Serializes a response payload for the database viewer with orjson."""
+    return orjson.dumps(payload).decode()
+
 @trace
 def get_db_client() -> chromadb.PersistentClient:
     """
-    Initializes and returns a persistent ChromaDB client.
+    Returns the shared persistent ChromaDB client.
 
     Returns:
-        An instance of the ChromaDB PersistentClient.
+        The process-wide ChromaDB PersistentClient.
 
     Raises:
         FileNotFoundError: If the ChromaDB directory specified in the config
@@ -34,7 +39,7 @@ def get_db_client() -> chromadb.PersistentClient:
     """
     if not os.path.exists(CHROMA_DB_PATH):
         raise FileNotFoundError("ChromaDB directory not found.")
-    return chromadb.PersistentClient(path=CHROMA_DB_PATH)
+    return get_chroma_client()
 
 @trace
 def list_collections_as_json() -> str:
@@ -64,9 +69,9 @@ def list_collections_as_json() -> str:
             collection_list.append({"name": col.name, "count": col.count(), "last_modified": last_modified})
 
         collection_list.sort(key=lambda x: x["last_modified"], reverse=True)
-        return json.dumps({"status": "success", "collections": collection_list})
+        return _to_json({"status": "success", "collections": collection_list})
     except Exception as e:
-        return json.dumps({"status": "error", "message": str(e)})
+        return _to_json({"status": "error", "message": str(e)})
 
 @trace
 def get_collection_data_as_json(collection_name: str) -> str:
@@ -87,7 +92,7 @@ def get_collection_data_as_json(collection_name: str) -> str:
         all_records = db_store.get_all_records()
 
         if not all_records:
-            return json.dumps({"status": "success", "collection_name": collection_name, "data": []})
+            return _to_json({"status": "success", "collection_name": collection_name, "data": []})
 
         formatted_data = []
         for record in all_records:
@@ -111,7 +116,7 @@ def get_collection_data_as_json(collection_name: str) -> str:
             )
 
         formatted_data.sort(key=lambda x: x.get("Timestamp", ""), reverse=True)
-        return json.dumps(
+        return _to_json(
             {
                 "status": "success",
                 "collection_name": collection_name,
@@ -119,7 +124,7 @@ def get_collection_data_as_json(collection_name: str) -> str:
             }
         )
     except Exception as e:
-        return json.dumps(
+        return _to_json(
             {
                 "status": "error",
                 "message": f"Failed to retrieve collection '{collection_name}': {e}",
@@ -134,7 +139,7 @@ def inspect_database_cli() -> None:
     """
     print("--- ChromaDB Inspector (CLI) ---")
     try:
-        collections_json = json.loads(list_collections_as_json())
+        collections_json = orjson.loads(list_collections_as_json())
         if collections_json["status"] == "error":
             print(f"Error: {collections_json['message']}")
             return
@@ -160,7 +165,7 @@ def inspect_database_cli() -> None:
                 print("Invalid input. Please enter a number from the list.")
 
         print(f"\\n--- Inspecting Collection: {selected_collection_name} ---")
-        data_json = json.loads(get_collection_data_as_json(selected_collection_name))
+        data_json = orjson.loads(get_collection_data_as_json(selected_collection_name))
 
         if data_json["status"] == "error":
             print(f"Error: {data_json['message']}")
@@ -15,11 +15,29 @@ document.addEventListener('DOMContentLoaded', () => {
     const agentText = document.getElementById('agent-text');
 
     const SERVER_URL = window.location.origin;
-    const socket = io(SERVER_URL);
+    // Open the WebSocket transport straight away instead of starting on HTTP
+    // long-polling and upgrading; fall back to polling only if it fails.
+    const socket = io(SERVER_URL, { transports: ['websocket'] });
+    socket.on('connect_error', () => {
+        socket.io.opts.transports = ['polling', 'websocket'];
+    });
     let currentSessionName = '[New Session]';
 
+    // Audit events are collected for AUDIT_FLUSH_MS and sent as one 'log_audit_events'
+    // message, rather than one Socket.IO frame per event.
+    const AUDIT_FLUSH_MS = 50;
+    let pendingAuditEvents = [];
+
+    const flushAuditEvents = () => {
+        socket.emit('log_audit_events', { events: pendingAuditEvents });
+        pendingAuditEvents = [];
+    };
+
     const logClientEvent = (eventName, details = {}, destination = "Server", control_flow = null) => {
-        socket.emit('log_audit_event', { 
+        if (pendingAuditEvents.length === 0) {
+            setTimeout(flushAuditEvents, AUDIT_FLUSH_MS);
+        }
+        pendingAuditEvents.push({ 
             event: eventName, 
             details: details,
             source: "Client",
@@ -143,6 +161,14 @@ document.addEventListener('DOMContentLoaded', () => {
         addToolLog(msg.data);
     });
 
+    socket.on('replay_batch', (batch) => {
+        logClientEvent("Socket.IO Event Received: replay_batch", {"size": batch.length}, "Client", null);
+        batch.forEach(({ event, data }) => {
+            if (event === 'tool_log') addToolLog(data.data);
+            else if (event === 'log_message') addConversationLog(data.data, data.type);
+        });
+    });
+
     socket.on('request_user_confirmation', (data) => {
         logClientEvent("Socket.IO Event Received: request_user_confirmation", {"data": data}, "Client", null);
         if (!data || !data.prompt) {
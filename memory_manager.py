@@ -13,6 +13,7 @@ The core state is the global 'embedding_function' used for all DB operations.
 
 import chromadb
 import logging
+import threading
 import uuid
 import time
 from vertexai.generative_models import Content, Part
@@ -43,6 +44,27 @@ def initialize_embedding_function() -> Optional[embedding_functions.EmbeddingFun
 # --- Bootstrap Sequence ---
 embedding_function = initialize_embedding_function()
 
+# Opening a PersistentClient re-validates the tenant and database on disk, so a
+# single client is opened on first use and shared by every store in the process.
+chroma_client: Optional[Any] = None
+# Sessions build their stores in tpool worker threads, so first use can race.
+_chroma_client_lock = threading.Lock()
+
+@trace
+def get_chroma_client() -> Any:
+    """
+    Returns the process-wide ChromaDB client, opening it on first use.
+
+    Returns:
+        The shared ChromaDB PersistentClient.
+    """
+    global chroma_client
+    if chroma_client is None:
+        with _chroma_client_lock:
+            if chroma_client is None:
+                chroma_client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
+    return chroma_client
+
 class ChromaDBStore:
     """
     Handles all direct read/write interactions with a specific ChromaDB collection.
@@ -65,8 +87,8 @@ class ChromaDBStore:
             return
 
         try:
-            # Establishes a persistent client connection to the database on disk.
-            chroma_client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
+            # Reuses the shared persistent client connection to the database on disk.
+            chroma_client = get_chroma_client()
             # Sanitize the collection name to meet ChromaDB's requirements.
             sanitized_name = "".join(c for c in self.name if c.isalnum() or c in ["_", "-"]).strip()
             if len(sanitized_name) < 3:
@@ -90,6 +112,25 @@ class ChromaDBStore:
         except Exception as e:
             logging.error(f"Could not add record to collection '{self.name}': {e}")
 
+    @trace
+    def add_records(self, records: List[MemoryRecord], record_ids: List[str]) -> None:
+        """
+        Adds several MemoryRecords to the collection in a single batched call.
+
+        One `add` lets ChromaDB embed every document in one pass instead of one
+        embedding call and write per record. If the batch is rejected, the records
+        are retried one at a time so a single bad record cannot drop the rest.
+        """
+        if not self.collection or not records:
+            return
+        try:
+            metadatas = [record.model_dump(exclude={"id", "document"}, exclude_none=True) for record in records]
+            self.collection.add(documents=[record.document for record in records], metadatas=metadatas, ids=record_ids)
+        except Exception as e:
+            logging.warning(f"Batched add to collection '{self.name}' failed, adding records individually: {e}")
+            for record, record_id in zip(records, record_ids):
+                self.add_record(record, record_id)
+
     @trace
     def get_all_records(self) -> List[MemoryRecord]:
         """Retrieves and validates all records from the collection, sorted by time."""
@@ -168,8 +209,7 @@ class ChromaDBStore:
         if not self.collection:
             return
         try:
-            chroma_client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
-            chroma_client.delete_collection(name=self.name)
+            get_chroma_client().delete_collection(name=self.name)
             logging.info(f"Deleted ChromaDB collection: {self.name}")
         except Exception as e:
             logging.error(f"Error deleting collection {self.name}: {e}")
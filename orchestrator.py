@@ -5,26 +5,50 @@ This module contains the primary reasoning loop that drives the agent's behavior
 It orchestrates the interaction between the agent's memory, the generative model,
 and the tool execution system, forming the "brain" of the application.
 
-The core state is managed in the module-level 'confirmation_events' dictionary,
+A pending user confirmation is held on the session's ActiveSession object,
 which allows the reasoning loop to pause and wait for user input.
 """
+import eventlet
 from eventlet import tpool
 from eventlet.event import Event
 from utils import get_timestamp
-import json
+import hashlib
 import logging
+import orjson
 import uuid
-import re
 from tool_agent import execute_tool_command
 from data_models import ToolCommand, ParsedAgentResponse
 from session_models import ActiveSession
-from response_parser import parse_agent_response, _handle_payloads, is_prose_effectively_empty
-from config import ABSOLUTE_MAX_ITERATIONS_REASONING_LOOP, NOMINAL_MAX_ITERATIONS_REASONING_LOOP
+from response_parser import parse_agent_response, _handle_payloads, is_prose_effectively_empty, _TIMESTAMP_PREFIX_RE
+from config import ABSOLUTE_MAX_ITERATIONS_REASONING_LOOP, NOMINAL_MAX_ITERATIONS_REASONING_LOOP, PLAN_CACHE_MAX_ENTRIES
 from tracer import trace
 
-# A dictionary to hold event objects for user confirmation, keyed by session_id.
-# This allows the reasoning loop to pause and wait for user input.
-confirmation_events: dict[str, Event] = {}
+# Prefix of the prompt that feeds a tool result back to the model.
+_TOOL_RESULT_PREFIX = "Tool Result: "
+# Fixed instruction that follows the iteration counter in every loop prompt.
+_ITERATION_INSTRUCTION = "You MUST issue a `respond` command on or before the final iteration.\n\n"
+# Prompts the loop generates itself; retrieving memory context for them is wasted work.
+_NO_RETRIEVAL_PREFIXES = (_TOOL_RESULT_PREFIX, "USER_CONFIRMATION:")
+# Side-effect-free tools whose result depends on the prompt's target, so they may
+# be run ahead of the model's answer and discarded.
+_SPECULATIVE_ACTIONS = frozenset(
+    {"read_file", "read_project_file", "list_allowed_project_files", "list_directory"}
+)
+# Maps a session name and normalized initial prompt to the first tool command it last produced.
+_plan_cache: dict[str, ToolCommand] = {}
+
+@trace
+def _plan_cache_key(session_name: str, prompt: str) -> str:
+    """Hashes a session's prompt with case and whitespace differences normalized away."""
+    normalized = " ".join(prompt.split()).lower()
+    return hashlib.blake2b(f"{session_name}\0{normalized}".encode(), digest_size=16).hexdigest()
+
+@trace
+def _remember_plan(plan_key: str, command: ToolCommand) -> None:
+    """Records the first tool command of a loop, evicting the oldest entry when full."""
+    if plan_key not in _plan_cache and len(_plan_cache) >= PLAN_CACHE_MAX_ENTRIES:
+        del _plan_cache[next(iter(_plan_cache))]
+    _plan_cache[plan_key] = ToolCommand(action=command.action, parameters=dict(command.parameters))
 
 @trace
 def _emit_agent_message(socketio, session_id: str, message_type: str, content: str) -> None:
@@ -101,11 +125,13 @@ def _render_agent_turn(socketio, session_id: str, parsed_response: ParsedAgentRe
     """   
 
     command = parsed_response.command
+    action = command.action
+    params = command.parameters
     prose = command.attachment or ""
 
     # Case 1: The command is a final answer for the user.
-    if command.action in ["respond", "task_complete"]:
-        response_param = command.parameters.get("response", "")
+    if action in ["respond", "task_complete"]:
+        response_param = params.get("response", "")
         # The definitive message is whichever is longer: the prose or the 'response' parameter.
         final_message = response_param if len(response_param) > len(prose) else prose
         
@@ -114,12 +140,12 @@ def _render_agent_turn(socketio, session_id: str, parsed_response: ParsedAgentRe
              _emit_agent_message(socketio, session_id, "final_answer", final_message)
 
     # Case 2: The command is a request for user confirmation.
-    elif command.action == "request_confirmation":
+    elif action == "request_confirmation":
         # Display any introductory prose first.
         if not parsed_response.is_prose_empty:
             _emit_agent_message(socketio, session_id, "info", prose)
         
-        prompt = command.parameters.get("prompt", "Are you sure?")
+        prompt = params.get("prompt", "Are you sure?")
         # If this is a live reasoning loop, show interactive Yes/No buttons.
         if is_live:
             socketio.emit("request_user_confirmation", {"prompt": prompt}, to=session_id)
@@ -166,24 +192,39 @@ def execute_reasoning_loop(
     loop_id = str(uuid.uuid4())
     current_prompt = initial_prompt
     destruction_confirmed = False # State flag for approved destructive actions.
+    speculative_task = None
 
     try:
         chat = session_data.chat
         memory = session_data.memory
 
+        # If this session's prompt previously opened with a read-only tool call, that
+        # call is run while the model is thinking and reused if the model asks for it again.
+        plan_key = _plan_cache_key(session_data.name, initial_prompt)
+        speculative_command = _plan_cache.get(plan_key)
+        if speculative_command is not None:
+            # A plain GreenThread, since wait() hands back the tool result.
+            speculative_task = eventlet.spawn(
+                execute_tool_command, speculative_command, socketio, session_id, chat_sessions, haven_proxy, loop_id
+            )
+
         # The core cognitive loop, limited to a max number of iterations for safety.
         for i in range(ABSOLUTE_MAX_ITERATIONS_REASONING_LOOP):
             socketio.sleep(0)  # Yield to other greenlets, keeping the server responsive.
 
             # --- Step 1: Prepare the Prompt ---
             # Augment the current prompt with relevant context from long-term memory (RAG).
-            final_prompt = memory.prepare_augmented_prompt(current_prompt)
+            # Tool results and confirmation replies are skipped: a vector search on a
+            # JSON blob or a 'yes'/'no' is costly and retrieves nothing useful.
+            if current_prompt.startswith(_NO_RETRIEVAL_PREFIXES):
+                final_prompt = current_prompt
+            else:
+                final_prompt = memory.prepare_augmented_prompt(current_prompt)
 
             # Add iteration information to the final prompt to give the model awareness of the loop's state.
             final_prompt_with_iteration = (
                 f"This is iteration {i + 1} of {NOMINAL_MAX_ITERATIONS_REASONING_LOOP} of the reasoning loop.\n"
-                f"You MUST issue a `respond` command on or before the final iteration.\n\n"
-                f"{final_prompt}"
+                f"{_ITERATION_INSTRUCTION}{final_prompt}"
             )
             # Persist the user-side turn to memory for auditing and future context.
             memory.add_turn("user", current_prompt, augmented_prompt=final_prompt_with_iteration)
@@ -194,7 +235,7 @@ def execute_reasoning_loop(
             response_text = response.text
             
             # Ensure the response has a timestamp for consistent logging format.
-            if not re.match(r"^\[\d{2}[A-Z]{3}\d{4}_\d{2}\d{2}\d{2}[AP]M\]", response_text):
+            if not _TIMESTAMP_PREFIX_RE.match(response_text):
                 response_text = f"[{get_timestamp()}] {response_text}"
 
             # Persist the raw model response to memory.
@@ -207,7 +248,9 @@ def execute_reasoning_loop(
             # Pass the entire structured object to the renderer to update the client UI.
             _render_agent_turn(socketio, session_id, parsed_response, is_live=True)
 
-            action = parsed_response.command.action
+            # Bind the command once; it is read again for dispatch below.
+            command = parsed_response.command
+            action = command.action
 
             # --- Step 4: Handle Loop Control and Termination ---
             # Force agent to respond if it exceeds the nominal iteration limit.
@@ -227,23 +270,40 @@ def execute_reasoning_loop(
             if action in ["delete_file", "delete_session"] and not destruction_confirmed:
                 err_msg = f"Action '{action}' is destructive. Use 'request_confirmation' first."
                 logging.warning(err_msg)
-                current_prompt = f"Tool Result: {json.dumps({'status': 'error', 'message': err_msg})}"
+                current_prompt = _TOOL_RESULT_PREFIX + orjson.dumps({"status": "error", "message": err_msg}).decode()
                 continue
 
             if action == "request_confirmation":
                 # Pause the loop and wait for the user to respond 'yes' or 'no' via the UI.
                 confirmation_event = Event()
-                confirmation_events[session_id] = confirmation_event
+                session_data.confirmation_event = confirmation_event
                 user_response = confirmation_event.wait()
-                confirmation_events.pop(session_id, None)
+                session_data.confirmation_event = None
                 
                 destruction_confirmed = user_response == "yes"
                 current_prompt = f"USER_CONFIRMATION: '{user_response}'"
                 continue
 
             # --- Step 6: Execute Tool and Prepare for Next Iteration ---
-            # Execute the requested tool command in a separate thread.
-            tool_result = execute_tool_command(parsed_response.command, socketio, session_id, chat_sessions, haven_proxy, loop_id)
+            # Execute the requested tool command in a separate thread, unless the
+            # speculative run already executed exactly this command.
+            if (
+                i == 0
+                and speculative_task is not None
+                and action == speculative_command.action
+                and command.parameters == speculative_command.parameters
+            ):
+                tool_result = speculative_task.wait()
+                speculative_task = None
+            else:
+                if speculative_task is not None:
+                    # The model opened differently; its guessed result will never be read.
+                    speculative_task.kill()
+                    speculative_task = None
+                    _plan_cache.pop(plan_key, None)
+                tool_result = execute_tool_command(command, socketio, session_id, chat_sessions, haven_proxy, loop_id)
+                if i == 0 and action in _SPECULATIVE_ACTIONS and tool_result.status == "success":
+                    _remember_plan(plan_key, command)
             
             # Reset confirmation status after any tool call.
             destruction_confirmed = False
@@ -255,7 +315,7 @@ def execute_reasoning_loop(
                 return
 
             # The result of the tool becomes the input for the next iteration of the loop.
-            current_prompt = f"Tool Result: {tool_result.model_dump_json()}"
+            current_prompt = _TOOL_RESULT_PREFIX + tool_result.model_dump_json()
 
     except Exception as e:
         # Gracefully handle any unexpected errors in the loop.
@@ -264,4 +324,7 @@ def execute_reasoning_loop(
         socketio.emit("log_message", {"type": "error", "data": error_message}, to=session_id)
     finally:
         # This will run regardless of whether the loop succeeded or failed.
+        if speculative_task is not None:
+            # The loop ended before reading the speculative result.
+            speculative_task.kill()
         logging.info(f"Reasoning Loop ended for session {session_id}.")
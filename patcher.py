@@ -19,6 +19,10 @@ import logging
 import re
 from typing import Tuple, Optional
 
+# Hunk header patterns, compiled once rather than looked up for every diff line.
+_HUNK_HEADER_RE = re.compile(r"@@ -(\d+)(,(\d+))? \+(\d+)(,(\d+))? @@.*")
+_HUNK_HEADER_COMMENT_RE = re.compile(r"@@.*( @@.*)")
+
 def _normalize_text(text: Optional[str]) -> str:
     """
     Normalizes text to prevent common patch failures.
@@ -74,7 +78,8 @@ def _correct_hunk_line_numbers(diff_content: str, original_content: str) -> str:
     line_idx = 0
     while line_idx < len(diff_lines):
         line = diff_lines[line_idx]
-        hunk_header_match = re.match(r"@@ -(\d+)(,(\d+))? \+(\d+)(,(\d+))? @@.*", line)
+        # Only lines opening with '@@ -' can be headers; the rest skip the regex.
+        hunk_header_match = _HUNK_HEADER_RE.match(line) if line.startswith("@@ -") else None
 
         if not hunk_header_match:
             corrected_diff_lines.append(line)
@@ -104,9 +109,14 @@ def _correct_hunk_line_numbers(diff_content: str, original_content: str) -> str:
         actual_start_line = -1
         if hunk_search_pattern:
             # Whitespace-agnostic search
+            first_pattern_line = hunk_search_pattern[0]
             for i in range(len(stripped_original_lines) - len(hunk_search_pattern) + 1):
-                # Compare stripped slices of the original content
-                if stripped_original_lines[i : i + len(hunk_search_pattern)] == hunk_search_pattern:
+                # Compare stripped slices of the original content, slicing only
+                # where the first line already matches.
+                if (
+                    stripped_original_lines[i] == first_pattern_line
+                    and stripped_original_lines[i : i + len(hunk_search_pattern)] == hunk_search_pattern
+                ):
                     actual_start_line = i + 1
                     break
 
@@ -123,7 +133,7 @@ def _correct_hunk_line_numbers(diff_content: str, original_content: str) -> str:
 
             # Reconstruct the header with corrected start lines and calculated counts
             new_header = f"@@ -{actual_start_line},{source_line_count} +{actual_target_start},{target_line_count} @@"
-            header_comment_match = re.search(r"@@.*( @@.*)", line)
+            header_comment_match = _HUNK_HEADER_COMMENT_RE.search(line)
             if header_comment_match:
                 new_header += header_comment_match.group(1)
 
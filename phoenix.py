@@ -6,27 +6,49 @@ to the persistent Haven service, and registers the web routes and SocketIO
 event handlers. It is responsible for starting the server and bringing all
 components of the application online.
 """
+import atexit
+import queue
 import time
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from flask import Flask, send_from_directory
 from flask_socketio import SocketIO
 from flask_cors import CORS
 from multiprocessing.managers import BaseManager
-import debugpy
 from typing import Optional, Tuple
 
-from config import DEBUG_MODE, SERVER_PORT, HAVEN_ADDRESS, HAVEN_AUTH_KEY
+from config import DEBUG_MODE, SERVER_PORT, STATIC_MAX_AGE_SECONDS, HAVEN_ADDRESS, HAVEN_AUTH_KEY
 import events
 from tracer import trace
 
+@trace
+def configure_logging() -> None:
+    """
+    Routes log records through a queue to a listener thread that writes them out.
+
+    Logging from a request handler or the reasoning loop then only formats and
+    enqueues the record, so console I/O never stalls the eventlet hub.
+    """
+    log_queue = queue.Queue(-1)
+    # Records are formatted when enqueued, so the listener's handler writes them as-is.
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    atexit.register(listener.stop)
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+
 @trace
 def configure_servers() -> Tuple[Flask, SocketIO]:
     """
     Initializes and configures the Flask and SocketIO servers and returns them
     for assignment at the module level for global accessibility.
     """
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    configure_logging()
     app = Flask(__name__)
+    # send_from_directory already answers revalidations with 304 via ETag and
+    # Last-Modified; a max-age also lets browsers skip the round-trip entirely.
+    app.config["SEND_FILE_MAX_AGE_DEFAULT"] = STATIC_MAX_AGE_SECONDS
     CORS(app)
     socketio = SocketIO(app, cors_allowed_origins="*", async_mode="eventlet")
     return app, socketio
@@ -138,6 +160,9 @@ if __name__ == "__main__":
         app.logger.critical("Server startup failed: Haven proxy could not be initialized.")
     else:
         if DEBUG_MODE:
+            # Imported only when debugging so normal startup never loads debugpy.
+            import debugpy
+
             debugpy.listen(("0.0.0.0", 5678))
             app.logger.info("Debugpy server listening. Waiting for debugger to attach...")
             debugpy.wait_for_client()
@@ -11,9 +11,58 @@ malformed JSON, and missing code fences.
 
 import re
 import json
+import functools
+import orjson
 from data_models import ToolCommand, ParsedAgentResponse
 from tracer import trace
 
+# Matches a ```json fenced block, capturing the whole block and the inner JSON
+# object. Compiled once at import time rather than on every parse.
+_JSON_FENCE_RE = re.compile(r"(?P<block>```json\s*\n?(?P<body>{.*?})\s*\n?```)", re.DOTALL)
+# Matches the rest of a JSON string literal, up to but excluding its closing
+# quote. It also stops at a backslash followed by a raw control character,
+# which is an invalid escape that repair must not turn into a valid one.
+_STRING_TAIL_RE = re.compile(r'(?:[^"\\]|\\[^\n\r\t])*')
+# Matches the braces and quotes that the brace-counting fallback tracks.
+_BRACE_TOKEN_RE = re.compile(r'[{}"]')
+# Matches a run of the whitespace json.loads accepts around a value.
+_JSON_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+# Matches an unescaped quote that can be neither the opening quote of a string
+# (it follows a non-structural character) nor a closing one (the next
+# non-whitespace character is not one that may follow a string). Such a quote
+# can only be a literal quote inside a string value.
+_INNER_QUOTE_RE = re.compile(r'(?<=[^\s{\[,:\\])"(?=\s*[^\s,:\]}])')
+# Escape sequences for the raw control characters models leave inside strings.
+_CONTROL_CHAR_ESCAPES = str.maketrans({"\n": "\\n", "\r": "\\r", "\t": "\\t"})
+# Matches the standard timestamp format (e.g., [06AUG2025_040527PM]) at the
+# very beginning of a string.
+_TIMESTAMP_PREFIX_RE = re.compile(r"^\[\d{2}[A-Z]{3}\d{4}_\d{2}\d{2}\d{2}[AP]M\]")
+# Matches a whole payload block. The \1 is a backreference to the captured
+# group (@@\w+), ensuring that a "START @@PLACEHOLDER" is only matched with its
+# corresponding "END @@PLACEHOLDER".
+_PAYLOAD_BLOCK_RE = re.compile(r"START (@@\w+).*?END \1", re.DOTALL)
+# Number of distinct texts whose extraction results are memoized.
+_EXTRACTION_CACHE_SIZE = 256
+# Texts longer than this bypass the extraction cache to bound its memory use.
+_EXTRACTION_CACHE_MAX_TEXT = 1_000_000
+
+def _memoize_extraction(func):
+    """
+    Memoizes a pure text -> result extractor, so that history replays and
+    repeated parses of the same model output reuse earlier results. Texts
+    above _EXTRACTION_CACHE_MAX_TEXT characters are always recomputed.
+    """
+    cached = functools.lru_cache(maxsize=_EXTRACTION_CACHE_SIZE)(func)
+
+    @functools.wraps(func)
+    def wrapper(text: str):
+        if len(text) > _EXTRACTION_CACHE_MAX_TEXT:
+            return func(text)
+        return cached(text)
+
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
 @trace
 def is_prose_effectively_empty(prose_string: str | None) -> bool:
     """
@@ -27,11 +76,8 @@ def is_prose_effectively_empty(prose_string: str | None) -> bool:
     """
     if not prose_string:
         return True
-    # This regex matches the standard timestamp format (e.g., [06AUG2025_040527PM])
-    # at the very beginning of the string.
-    timestamp_pattern = r"^\[\d{2}[A-Z]{3}\d{4}_\d{2}\d{2}\d{2}[AP]M\]"
-    # We remove the timestamp and then check if anything is left.
-    prose_without_timestamp = re.sub(timestamp_pattern, "", prose_string.strip())
+    # We remove the leading timestamp and then check if anything is left.
+    prose_without_timestamp = _TIMESTAMP_PREFIX_RE.sub("", prose_string.strip())
     # The prose is considered empty if nothing remains after stripping whitespace.
     return prose_without_timestamp.strip() == ""
 
@@ -65,28 +111,34 @@ def parse_agent_response(response_text: str) -> ParsedAgentResponse:
         - `is_prose_empty`: A boolean flag indicating if the prose is empty
                           or contains only a timestamp.
     """
+    # Each extraction pass below is only run if a cheap substring check finds
+    # the marker it looks for, so plain prose responses skip them entirely.
     # Step 1: Create a sanitized version of the text with all payload blocks removed.
     # This prevents the JSON extraction logic from accidentally finding JSON within a payload.
-    sanitized_text = _mask_payloads(response_text)
+    sanitized_text = _mask_payloads(response_text) if "START @@" in response_text else response_text
     
     # Step 2: Attempt to find a command JSON within the sanitized text.
-    # First, try finding a command enclosed in standard ```json fences.
-    full_match_block, command_json_str = _extract_json_with_fences(sanitized_text)
+    full_match_block, command_json_str = None, None
+    if "{" in sanitized_text:
+        # First, try finding a command enclosed in standard ```json fences.
+        if "```json" in sanitized_text:
+            full_match_block, command_json_str = _extract_json_with_fences(sanitized_text)
 
-    # If no fences are found, fall back to a more complex brace-counting method.
-    if not command_json_str:
-        full_match_block, command_json_str = _extract_json_with_brace_counting(sanitized_text)
+        # If no fences are found, fall back to a more complex brace-counting method.
+        if not command_json_str:
+            full_match_block, command_json_str = _extract_json_with_brace_counting(sanitized_text)
 
     # Step 3: If a potential command was found, parse it and construct the final prose.
     if command_json_str:
         try:
-            # First, try to load the JSON as is.
-            command_json = json.loads(command_json_str)
+            # First, try to load the JSON as is. orjson's decode error subclasses
+            # json.JSONDecodeError, so the same handler covers both parsers.
+            command_json = orjson.loads(command_json_str)
         except json.JSONDecodeError:
             # If that fails, attempt to repair common JSON errors.
             repaired_json_str = _repair_json(command_json_str)
             try:
-                command_json = json.loads(repaired_json_str)
+                command_json = orjson.loads(repaired_json_str)
             except json.JSONDecodeError:
                 # If repair also fails, give up and treat the entire response as prose.
                 return ParsedAgentResponse(
@@ -116,66 +168,112 @@ def _mask_payloads(text: str) -> str:
     """
     Finds and removes all payload blocks (e.g., START @@... END @@...).
     """
-    # The \1 is a backreference to the captured group (@@\w+), ensuring that
-    # a "START @@PLACEHOLDER" is only matched with its corresponding "END @@PLACEHOLDER".
-    pattern = re.compile(r"START (@@\w+).*?END \1", re.DOTALL)
-    return pattern.sub("", text)
+    return _PAYLOAD_BLOCK_RE.sub("", text)
 
 @trace
+@_memoize_extraction
 def _extract_json_with_fences(text: str) -> tuple[str | None, str | None]:
     """
     Extracts the largest JSON block enclosed in ```json fences.
     """
-    pattern = r"(```json\s*\n?({.*?})\s*\n?```)"
-    matches = list(re.finditer(pattern, text, re.DOTALL))
-    if not matches:
+    largest_match = None
+    largest_size = -1
+    # Single pass over the text; if multiple JSON blocks exist, assume the
+    # largest one is the intended command.
+    for match in _JSON_FENCE_RE.finditer(text):
+        start, end = match.span("body")
+        if end - start > largest_size:
+            largest_match, largest_size = match, end - start
+    if largest_match is None:
         return None, None
-    # If multiple JSON blocks exist, assume the largest one is the intended command.
-    largest_match = max(matches, key=lambda m: len(m.group(2)))
     # Return both the full block (with fences) and the inner JSON content.
-    return largest_match.group(1), largest_match.group(2)
+    return largest_match.group("block"), largest_match.group("body")
 
 @trace
+@_memoize_extraction
 def _extract_json_with_brace_counting(text: str) -> tuple[str | None, str | None]:
     """
     Finds the largest valid JSON object in a string by counting braces.
     This is a fallback for when the LLM forgets to use markdown fences.
+
+    The text is scanned once for braces and quotes; each candidate start then
+    walks only those tokens rather than every character of the remaining text.
     """
     best_json_candidate = None
-    start_indices = [m.start() for m in re.finditer("{", text)]
-    for start_index in start_indices:
+    tokens = [(m.start(), m.group()) for m in _BRACE_TOKEN_RE.finditer(text)]
+    for first_token, (start_index, start_char) in enumerate(tokens):
+        if start_char != "{":
+            continue
         open_braces = 0
         in_string = False
-        for i, char in enumerate(text[start_index:]):
+        for token_index in range(first_token, len(tokens)):
+            pos, char = tokens[token_index]
             # Toggle in_string flag if we encounter a quote that isn't escaped.
-            if char == '"' and (i == 0 or text[start_index + i - 1] != "\\"):
-                in_string = not in_string
+            if char == '"':
+                if pos == start_index or text[pos - 1] != "\\":
+                    in_string = not in_string
+                continue
             # Only count braces if we're not inside a string value.
             if not in_string:
-                if char == "{":
-                    open_braces += 1
-                elif char == "}":
-                    open_braces -= 1
-            # When braces are balanced, we may have found a complete JSON object.
-            if open_braces == 0:
-                potential_json = text[start_index : start_index + i + 1]
-                try:
-                    repaired_potential = _repair_json(potential_json)
-                    json.loads(repaired_potential)
-                    # If it's valid and the largest found so far, store it.
-                    if not best_json_candidate or len(repaired_potential) > len(best_json_candidate):
-                        best_json_candidate = repaired_potential
-                except json.JSONDecodeError:
-                    continue # Not a valid JSON, keep searching.
+                open_braces += 1 if char == "{" else -1
+            # An object can only end on a closing brace where the braces balance.
+            if char == "}" and open_braces == 0:
+                candidate = _largest_valid_object(text, start_index, pos + 1)
+                # If it's valid and the largest found so far, store it.
+                if candidate and (not best_json_candidate or len(candidate) > len(best_json_candidate)):
+                    best_json_candidate = candidate
     # Returns the candidate for both tuple values for a consistent interface.
     return best_json_candidate, best_json_candidate
 
+@trace
+def _largest_valid_object(text: str, start: int, end: int) -> str | None:
+    """
+    Returns the longest valid (repaired) JSON text that starts at `start` and
+    closes with the brace ending at `end`, or None if there is none.
+
+    Besides the object itself, only versions extended by trailing JSON
+    whitespace can parse, so those are the only other lengths considered.
+    """
+    candidate = _repair_candidate(text[start:end])
+    ws_end = _JSON_WHITESPACE_RE.match(text, end).end()
+    if candidate is None or ws_end == end:
+        return candidate
+    # An object that parsed without repair stays valid with whitespace appended.
+    if candidate == text[start:end]:
+        return text[start:ws_end]
+    for stop in range(ws_end, end, -1):
+        extended = _repair_candidate(text[start:stop])
+        if extended is not None:
+            return extended
+    return candidate
+
+@trace
+def _repair_candidate(potential_json: str) -> str | None:
+    """Returns the repaired form of a JSON candidate if it parses, otherwise None."""
+    repaired_potential = _repair_json(potential_json)
+    try:
+        orjson.loads(repaired_potential)
+    except json.JSONDecodeError:
+        return None # Not a valid JSON, keep searching.
+    return repaired_potential
+
 @trace
 def _repair_json(s: str) -> str:
     """
     Attempts to repair a malformed JSON string by iteratively fixing common errors.
+
+    Valid input is recognised with a single orjson pass; only malformed input
+    enters the repair loop, whose fixes key off the stdlib decoder's messages.
     """
+    try:
+        orjson.loads(s)
+        return s
+    except json.JSONDecodeError:
+        pass
     s_before_loop = s
+    # Escape the quotes that are unambiguously literal in one substitution, so
+    # the loop below only has to re-parse for the ones that need context.
+    s = _INNER_QUOTE_RE.sub(r'\\"', s)
     for _ in range(1000): # Max iterations to prevent infinite loops.
         try:
             json.loads(s)
@@ -184,20 +282,20 @@ def _repair_json(s: str) -> str:
             error_fixed = False
             # Fix 1: Unescaped control characters (e.g., newlines in string content).
             if "Invalid control character" in e.msg:
-                char_to_escape = s[e.pos]
-                escape_map = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
-                if char_to_escape in escape_map:
-                    s = s[:e.pos] + escape_map[char_to_escape] + s[e.pos + 1:]
+                if s[e.pos] in "\n\r\t":
+                    # Every raw control character between here and the end of the
+                    # current string literal would fail the same way, so escape the
+                    # whole run in one pass instead of re-parsing after each one.
+                    tail_end = _STRING_TAIL_RE.match(s, e.pos).end()
+                    s = "".join((s[:e.pos], s[e.pos:tail_end].translate(_CONTROL_CHAR_ESCAPES), s[tail_end:]))
                     error_fixed = True
             # Fix 2: Unescaped double quotes inside a string.
             elif "Expecting" in e.msg or "Unterminated string" in e.msg:
                 quote_pos = s.rfind('"', 0, e.pos)
                 if quote_pos != -1:
                     # Check if it's already properly escaped by counting preceding backslashes.
-                    p, slashes = quote_pos - 1, 0
-                    while p >= 0 and s[p] == "\\":
-                        slashes += 1
-                        p -= 1
+                    prefix = s[:quote_pos]
+                    slashes = len(prefix) - len(prefix.rstrip("\\"))
                     # If the number of slashes is even, the quote is unescaped. Add a slash.
                     if slashes % 2 == 0:
                         s = s[:quote_pos] + "\\" + s[quote_pos:]
@@ -236,7 +334,25 @@ def _handle_payloads(prose: str | None, command: ToolCommand | None) -> tuple[st
     if placeholders_found:
         temp_prose = prose
         for placeholder in placeholders_found:
-            pattern = re.compile(f"START {re.escape(placeholder)}.*?END {re.escape(placeholder)}", re.DOTALL)
-            temp_prose = pattern.sub("", temp_prose)
+            temp_prose = _remove_marked_blocks(temp_prose, f"START {placeholder}", f"END {placeholder}")
         prose = temp_prose.strip()
     return prose, command
+
+@trace
+def _remove_marked_blocks(text: str, start_marker: str, end_marker: str) -> str:
+    """
+    Removes every block running from `start_marker` to the nearest following
+    `end_marker` (inclusive), scanning with plain substring searches.
+    """
+    pieces = []
+    pos = 0
+    while (start := text.find(start_marker, pos)) != -1:
+        end = text.find(end_marker, start + len(start_marker))
+        if end == -1:
+            break
+        pieces.append(text[pos:start])
+        pos = end + len(end_marker)
+    if not pieces:
+        return text
+    pieces.append(text[pos:])
+    return "".join(pieces)
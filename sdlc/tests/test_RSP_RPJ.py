@@ -13,6 +13,11 @@ from response_parser import _repair_json
         "RSP_RPJ_001_TC2",
         '{"quote": "This is an "unescaped" quote"}',
         '{"quote": "This is an \\"unescaped\\" quote"}'
+    ),
+    (
+        "RSP_RPJ_001_TC3",
+        '{\n"notes": "line1\nline2\r\nline3\tend",\n"more": "a\nb"\n}',
+        '{\n"notes": "line1\\nline2\\r\\nline3\\tend",\n"more": "a\\nb"\n}'
     )
 ])
 def test_RSP_RPJ_001_json_repair(test_id, malformed_json, expected_repaired_json):
@@ -5,6 +5,7 @@ This module contains the Pydantic models that encapsulate the complete state
 of a single, active user session, bundling together all the necessary service
 proxies and managers required for the application's logic to operate.
 """
+from eventlet.event import Event
 from pydantic import BaseModel, ConfigDict
 from memory_manager import MemoryManager
 from proxies import HavenProxyWrapper
@@ -29,3 +30,9 @@ class ActiveSession(BaseModel):
     memory: MemoryManager
     # The unique, persistent name of the session (e.g., 'Session_07AUG2025_...').
     name: str
+    # The last session list payload sent to this client, so that an unchanged
+    # list is not serialised and emitted again.
+    last_session_list: dict | None = None
+    # The event a paused reasoning loop is waiting on for the user's yes/no
+    # confirmation, or None when no confirmation is pending.
+    confirmation_event: Event | None = None
@@ -1,8 +1,17 @@
+import threading
 import time
+import pytest
+import memory_manager
 from memory_manager import ChromaDBStore
 from data_models import MemoryRecord
 
 
+@pytest.fixture(autouse=True)
+def fresh_chroma_client(monkeypatch):
+    """Ensures each test opens its own (mocked) client instead of a shared one."""
+    monkeypatch.setattr(memory_manager, "chroma_client", None)
+
+
 def test_chromadb_store_add_record(mocker):
     """
     Tests that ChromaDBStore.add_record calls the underlying chromadb client
@@ -33,3 +42,85 @@ def test_chromadb_store_add_record(mocker):
     metadata_passed_to_db = call_kwargs["metadatas"][0]
     assert "summary" not in metadata_passed_to_db  # because it was None
     assert metadata_passed_to_db["role"] == "user"
+
+
+def test_chromadb_store_add_records_batches_into_one_call(mocker):
+    """
+    Tests that ChromaDBStore.add_records writes all records with a single `add`
+    call, keeping documents, metadata and ids aligned.
+    """
+    mock_chroma_client = mocker.patch("memory_manager.chromadb.PersistentClient")
+    mock_collection = mocker.MagicMock()
+    mock_chroma_client.return_value.get_or_create_collection.return_value = mock_collection
+
+    records = [
+        MemoryRecord(role="user", timestamp=time.time(), document="First"),
+        MemoryRecord(role="model", timestamp=time.time(), document="Second"),
+    ]
+    record_ids = [str(record.id) for record in records]
+
+    db_store = ChromaDBStore(collection_name="test-collection")
+    db_store.add_records(records, record_ids)
+
+    mock_collection.add.assert_called_once()
+    _, call_kwargs = mock_collection.add.call_args
+    assert call_kwargs["documents"] == ["First", "Second"]
+    assert call_kwargs["ids"] == record_ids
+    assert [meta["role"] for meta in call_kwargs["metadatas"]] == ["user", "model"]
+
+
+def test_chromadb_store_add_records_falls_back_to_single_adds(mocker):
+    """
+    Tests that a rejected batch is retried record by record.
+    """
+    mock_chroma_client = mocker.patch("memory_manager.chromadb.PersistentClient")
+    mock_collection = mocker.MagicMock()
+    mock_collection.add.side_effect = [ValueError("batch rejected"), None, None]
+    mock_chroma_client.return_value.get_or_create_collection.return_value = mock_collection
+
+    records = [
+        MemoryRecord(role="user", timestamp=time.time(), document="First"),
+        MemoryRecord(role="model", timestamp=time.time(), document="Second"),
+    ]
+
+    db_store = ChromaDBStore(collection_name="test-collection")
+    db_store.add_records(records, [str(record.id) for record in records])
+
+    assert mock_collection.add.call_count == 3
+    assert mock_collection.add.call_args_list[2].kwargs["documents"] == ["Second"]
+
+
+def test_chromadb_stores_share_one_client(mocker):
+    """
+    Tests that several ChromaDBStore instances reuse a single PersistentClient
+    instead of opening a new connection each time.
+    """
+    mock_chroma_client = mocker.patch("memory_manager.chromadb.PersistentClient")
+
+    ChromaDBStore(collection_name="turns-first")
+    ChromaDBStore(collection_name="code-first")
+
+    mock_chroma_client.assert_called_once()
+    assert mock_chroma_client.return_value.get_or_create_collection.call_count == 2
+
+
+def test_concurrent_first_use_opens_one_client(mocker):
+    """
+    Tests that threads racing to open the shared client (as tpool workers do
+    when sessions are created together) still open only one PersistentClient.
+    """
+    def slow_client(path):
+        time.sleep(0.05)
+        return mocker.MagicMock()
+
+    mock_chroma_client = mocker.patch("memory_manager.chromadb.PersistentClient", side_effect=slow_client)
+
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(memory_manager.get_chroma_client())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    mock_chroma_client.assert_called_once()
+    assert all(client is clients[0] for client in clients)
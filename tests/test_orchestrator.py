@@ -116,3 +116,95 @@ def test_reasoning_loop_list_files_scenario(setup_mocks):
             final_answer_emitted = True
 
     assert final_answer_emitted, "The final answer was not emitted to the client."
+
+
+def test_reasoning_loop_reuses_speculative_tool_result(setup_mocks):
+    """
+    Tests that a prompt seen before runs its cached read-only tool call
+    ahead of the model, and that the speculative run's result is what the
+    model receives when it asks for the same command, without executing the
+    tool a second time.
+    """
+    # 1. ARRANGE: Seed the plan cache with the command this prompt produced last time.
+    import orchestrator
+
+    mocks = setup_mocks
+    session_data = MagicMock(chat=mocks["chat"], memory=mocks["memory"])
+    session_data.name = "test-session"
+    plan_key = orchestrator._plan_cache_key("test-session", mocks["initial_prompt"])
+    orchestrator._plan_cache[plan_key] = ToolCommand(action="list_directory", parameters={})
+
+    speculative_result = ToolResult(status="success", message="Listed files in directory.", content=["file1.txt"])
+    mocks["execute_tool_command"].return_value = speculative_result
+    mocks["chat"].send_message.side_effect = [
+        MagicMock(text='```json\n{"action": "list_directory", "parameters": {}}\n```'),
+        MagicMock(text='```json\n{"action": "respond", "parameters": {"response": "file1.txt"}}\n```'),
+    ]
+
+    # 2. ACT
+    try:
+        execute_reasoning_loop(
+            socketio=mocks["socketio"],
+            session_data=session_data,
+            initial_prompt=mocks["initial_prompt"],
+            session_id=mocks["session_id"],
+            chat_sessions=mocks["chat_sessions"],
+            haven_proxy=mocks["haven_proxy"],
+        )
+    finally:
+        orchestrator._plan_cache.pop(plan_key, None)
+
+    # 3. ASSERT: Only the speculative run executed the tool, and its result was fed back.
+    mocks["execute_tool_command"].assert_called_once()
+    called_command = mocks["execute_tool_command"].call_args[0][0]
+    assert called_command.action == "list_directory"
+    second_prompt = mocks["chat"].send_message.call_args_list[1][0][0]
+    assert speculative_result.model_dump_json() in second_prompt
+
+
+def test_speculative_run_is_killed_when_model_opens_differently(setup_mocks, mocker):
+    """
+    Tests that a speculative run is cancelled when the model's first command
+    differs from the cached one, that the cache then follows the new command,
+    and that a plan recorded by another session is never used.
+    """
+    # 1. ARRANGE: One plan for this session and one for another session with the same prompt.
+    import orchestrator
+
+    mocks = setup_mocks
+    session_data = MagicMock(chat=mocks["chat"], memory=mocks["memory"])
+    session_data.name = "test-session"
+    plan_key = orchestrator._plan_cache_key("test-session", mocks["initial_prompt"])
+    other_key = orchestrator._plan_cache_key("other-session", mocks["initial_prompt"])
+    orchestrator._plan_cache[plan_key] = ToolCommand(action="read_file", parameters={"filename": "a.txt"})
+    orchestrator._plan_cache[other_key] = ToolCommand(action="list_directory", parameters={})
+
+    mock_spawn = mocker.patch("orchestrator.eventlet.spawn")
+    mocks["execute_tool_command"].return_value = ToolResult(status="success", message="Listed files in directory.")
+    mocks["chat"].send_message.side_effect = [
+        MagicMock(text='```json\n{"action": "list_directory", "parameters": {}}\n```'),
+        MagicMock(text='```json\n{"action": "respond", "parameters": {"response": "done"}}\n```'),
+    ]
+
+    # 2. ACT
+    try:
+        execute_reasoning_loop(
+            socketio=mocks["socketio"],
+            session_data=session_data,
+            initial_prompt=mocks["initial_prompt"],
+            session_id=mocks["session_id"],
+            chat_sessions=mocks["chat_sessions"],
+            haven_proxy=mocks["haven_proxy"],
+        )
+        new_plan = orchestrator._plan_cache.get(plan_key)
+    finally:
+        orchestrator._plan_cache.pop(plan_key, None)
+        orchestrator._plan_cache.pop(other_key, None)
+
+    # 3. ASSERT: Only this session's plan was started, then killed and replaced.
+    mock_spawn.assert_called_once()
+    assert mock_spawn.call_args[0][1].action == "read_file"
+    mock_spawn.return_value.kill.assert_called_once()
+    mock_spawn.return_value.wait.assert_not_called()
+    mocks["execute_tool_command"].assert_called_once()
+    assert new_plan.action == "list_directory"
@@ -14,23 +14,36 @@ providing a consistent data contract for the orchestrator.
 import os
 import io
 import logging
-from contextlib import redirect_stdout
+import functools
+import types
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, Optional
 from multiprocessing.managers import BaseManager
 
-import chromadb
 from eventlet import tpool
 
 import patcher
-from config import ALLOWED_PROJECT_FILES, CHROMA_DB_PATH
+from config import ALLOWED_PROJECT_FILES, MAX_READ_FILE_BYTES
 from data_models import ToolCommand, ToolResult
-from memory_manager import ChromaDBStore, MemoryManager
+from memory_manager import ChromaDBStore, MemoryManager, get_chroma_client
 from proxies import HavenProxyWrapper
 from session_models import ActiveSession
 from tracer import trace
 
 
+# Absolute path of the project root; tool paths are resolved against it.
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Directories that list_directory never descends into.
+_UNLISTED_DIRS = frozenset({"chroma_db", "sessions", ".git", "__pycache__"})
+# A highly restricted set of builtins, the only ones scripts may use, to prevent
+# malicious code execution. It is read-only so the shared table can never be
+# altered; `print` is added to each run's own copy by _execute_script.
+_SAFE_BUILTINS = types.MappingProxyType({
+    "range": range, "len": len, "str": str, "int": int,
+    "float": float, "list": list, "dict": dict, "set": set, "abs": abs,
+    "max": max, "min": min, "sum": sum,
+})
+
 # A data class to neatly pass context-dependent objects to tool handlers.
 @dataclass
 class ToolContext:
@@ -42,21 +55,21 @@ class ToolContext:
     loop_id: Optional[str]
 
 # --- Low-Level File System Helpers ---
+@functools.lru_cache(maxsize=256)
+def _compile_script(script_content: str):
+    """Compiles a script once; the model often re-runs the exact same source."""
+    return compile(script_content, "<string>", "exec")
+
 @trace
 def _execute_script(script_content: str) -> ToolResult:
     """Executes a Python script in a restricted environment and captures its output."""
     string_io = io.StringIO()
     try:
-        # Define a highly restricted set of globals to prevent malicious code execution.
-        restricted_globals = {
-            "__builtins__": {
-                "print": print, "range": range, "len": len, "str": str, "int": int,
-                "float": float, "list": list, "dict": dict, "set": set, "abs": abs,
-                "max": max, "min": min, "sum": sum,
-            }
-        }
-        with redirect_stdout(string_io):
-            exec(script_content, restricted_globals, {})
+        # Each script gets its own copy of the builtins, so nothing it does to them leaks
+        # into later runs. `print` is bound to the script's own buffer rather than
+        # redirecting the process-wide sys.stdout, which other tpool threads are writing to.
+        restricted_globals = {"__builtins__": dict(_SAFE_BUILTINS, print=functools.partial(print, file=string_io))}
+        exec(_compile_script(script_content), restricted_globals, {})
         return ToolResult(status="success", message="Script executed.", content=string_io.getvalue())
     except Exception as e:
         return ToolResult(status="error", message=str(e))
@@ -76,8 +89,13 @@ def _write_file(path: str, content: str) -> ToolResult:
 def _read_file(path: str) -> ToolResult:
     """Reads the content of a file."""
     try:
-        if not os.path.exists(path):
+        # A single stat both confirms the file exists and sizes it before any read.
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
             return ToolResult(status="error", message="File not found.")
+        if size > MAX_READ_FILE_BYTES:
+            return ToolResult(status="error", message=f"File too large ({size} bytes; limit is {MAX_READ_FILE_BYTES}).")
         with open(path, "r", encoding="utf-8") as f:
             content = f.read()
         return ToolResult(status="success", content=content, message=f"Read content from '{os.path.basename(path)}'.")
@@ -100,26 +118,44 @@ def _list_directory(path: str) -> ToolResult:
     """Lists all files in a directory recursively, ignoring certain subdirectories."""
     try:
         file_list = []
-        for root, dirs, files in os.walk(path):
-            # Exclude specified directories from the walk.
-            dirs[:] = [d for d in dirs if d not in ["chroma_db", "sessions", ".git", "__pycache__"]]
-            for name in files:
-                relative_path = os.path.relpath(os.path.join(root, name), path)
-                file_list.append(relative_path.replace("\\", "/"))
+        # Walk with os.scandir, carrying each directory's relative prefix along so
+        # entries need no per-file stat, relpath or separator fix-up. Directories
+        # are visited in the same top-down order as os.walk.
+        pending = [(path, "")]
+        while pending:
+            dir_path, prefix = pending.pop()
+            try:
+                with os.scandir(dir_path) as entries:
+                    subdirs = []
+                    for entry in entries:
+                        if entry.is_dir():
+                            # Exclude specified directories (and symlinked ones) from the walk.
+                            if entry.name not in _UNLISTED_DIRS and not entry.is_symlink():
+                                subdirs.append((entry.path, f"{prefix}{entry.name}/"))
+                        else:
+                            file_list.append(prefix + entry.name)
+            except OSError:
+                continue
+            pending.extend(reversed(subdirs))
         return ToolResult(status="success", content=file_list, message="Listed files in directory.")
     except Exception as e:
         return ToolResult(status="error", message=str(e))
 
+@functools.lru_cache(maxsize=None)
+def _target_dir(base_dir_name: str) -> str:
+    """Returns the absolute path of a directory under the project root, creating it on first use."""
+    target_dir = os.path.join(_BASE_DIR, base_dir_name)
+    os.makedirs(target_dir, exist_ok=True)
+    return target_dir
+
 @trace
 def get_safe_path(filename: str, base_dir_name: str = "sandbox") -> str:
     """Constructs a safe file path within a designated directory, preventing path traversal."""
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    target_dir = os.path.join(base_dir, base_dir_name)
-    os.makedirs(target_dir, exist_ok=True)
+    target_dir = _target_dir(base_dir_name)
     # Get the absolute path of the requested file.
     requested_path = os.path.abspath(os.path.join(target_dir, filename))
-    # Ensure the resolved path is still within the target directory.
-    if not requested_path.startswith(target_dir):
+    # Ensure the resolved path is still within the target directory (and not a sibling sharing its prefix).
+    if requested_path != target_dir and not requested_path.startswith(target_dir + os.sep):
         raise ValueError("Attempted path traversal outside of the allowed directory.")
     return requested_path
 
@@ -259,11 +295,11 @@ def _handle_apply_patch(params: dict, context: ToolContext) -> ToolResult:
 def _handle_list_sessions(params: dict, context: ToolContext) -> ToolResult:
     """Handles the 'list_sessions' action."""
     try:
-        chroma_client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
-        db_collections = chroma_client.list_collections()
+        db_collections = get_chroma_client().list_collections()
         db_sessions = {col.name: {"status": "Saved"} for col in db_collections if col.name.startswith("turns-")}
         
-        live_session_names = context.haven_proxy.list_sessions()
+        # Haven proxy calls block on a socket, so they run in tpool like the file helpers.
+        live_session_names = tpool.execute(context.haven_proxy.list_sessions)
         for name in live_session_names:
             saved_name = f"turns-{name}"
             if saved_name in db_sessions:
@@ -285,14 +321,16 @@ def _handle_load_session(params: dict, context: ToolContext) -> ToolResult:
     if not session_name:
         return ToolResult(status="error", message="Session name not provided.")
     try:
-        turn_store: ChromaDBStore = ChromaDBStore(collection_name=f"turns-{session_name}")
-        history_records = turn_store.get_all_records()
-        history_for_haven = [{"role": r.role, "parts": [{"text": r.document}]} for r in history_records if r.role]
+        # The memory manager already rehydrates its buffer with the most recent turns,
+        # so Haven's history slice is built from that rather than a second full read.
+        memory_manager = tpool.execute(MemoryManager, session_name=session_name)
+        history_slice_for_haven = [
+            {"role": turn.role, "parts": [{"text": turn.parts[0].text}]}
+            for turn in memory_manager.get_conversational_buffer()
+        ]
 
         chat_wrapper = HavenProxyWrapper(context.haven_proxy, session_name)
-        memory_manager = MemoryManager(session_name=session_name)
-        history_slice_for_haven = history_for_haven[-memory_manager.max_buffer_size :]
-        context.haven_proxy.get_or_create_session(session_name, history_slice_for_haven)
+        tpool.execute(context.haven_proxy.get_or_create_session, session_name, history_slice_for_haven)
 
         context.chat_sessions[context.session_id] = ActiveSession(chat=chat_wrapper, memory=memory_manager, name=session_name)
         context.socketio.emit("session_name_update", {"name": session_name}, to=context.session_id)
@@ -314,15 +352,15 @@ def _handle_save_session(params: dict, context: ToolContext) -> ToolResult:
         source_turn_store: ChromaDBStore = session_data.memory.turn_store
         target_turn_store: ChromaDBStore = ChromaDBStore(collection_name=f"turns-{new_session_name}")
         records_to_copy = source_turn_store.get_all_records()
-        for record in records_to_copy:
-            target_turn_store.add_record(record, str(record.id))
+        target_turn_store.add_records(records_to_copy, [str(record.id) for record in records_to_copy])
 
         source_code_store: ChromaDBStore = session_data.memory.code_store
         target_code_store: ChromaDBStore = ChromaDBStore(collection_name=f"code-{new_session_name}")
         code_records_to_copy = source_code_store.get_all_records()
-        for record in code_records_to_copy:
-            pointer_id = f"[CODE-ARTIFACT-{record.id}:{record.filename}]"
-            target_code_store.add_record(record, pointer_id)
+        target_code_store.add_records(
+            code_records_to_copy,
+            [f"[CODE-ARTIFACT-{record.id}:{record.filename}]" for record in code_records_to_copy],
+        )
 
         session_data.memory.session_name = new_session_name
         session_data.memory.turn_store = target_turn_store
@@ -331,7 +369,7 @@ def _handle_save_session(params: dict, context: ToolContext) -> ToolResult:
         session_data.chat = HavenProxyWrapper(context.haven_proxy, new_session_name)
 
         history_for_haven = [{"role": r.role, "parts": [{"text": r.document}]} for r in records_to_copy if r.role]
-        context.haven_proxy.get_or_create_session(new_session_name, history_for_haven)
+        tpool.execute(context.haven_proxy.get_or_create_session, new_session_name, history_for_haven)
         context.socketio.emit("session_name_update", {"name": new_session_name}, to=context.session_id)
         return ToolResult(status="success", message=f"Session saved as '{new_session_name}'.")
     except Exception as e:
@@ -340,6 +378,7 @@ def _handle_save_session(params: dict, context: ToolContext) -> ToolResult:
 @trace
 def _handle_delete_session(params: dict, context: ToolContext) -> ToolResult:
     """Handles the 'delete_session' action."""
+    from events import emit_session_list_update
     session_name = params.get("session_name")
     if not session_name:
         return ToolResult(status="error", message="Session name not provided.")
@@ -348,10 +387,10 @@ def _handle_delete_session(params: dict, context: ToolContext) -> ToolResult:
         code_store = ChromaDBStore(collection_name=f"code-{session_name}")
         turn_store.delete_collection()
         code_store.delete_collection()
-        context.haven_proxy.delete_session(session_name)
+        tpool.execute(context.haven_proxy.delete_session, session_name)
         
         updated_list_result = _handle_list_sessions({}, context)
-        context.socketio.emit("session_list_update", updated_list_result.model_dump(), to=context.session_id)
+        emit_session_list_update(context.socketio, context.session_id, updated_list_result)
         return ToolResult(status="success", message=f"Session '{session_name}' deleted from both database and Haven.")
     except Exception as e:
         logging.error(f"Error deleting session '{session_name}': {e}")
@@ -5,18 +5,28 @@ This module is a collection of simple, reusable helper functions that do not
 fit into a more specific module and have no external dependencies other than
 standard Python libraries.
 """
-from datetime import datetime
+import time
 from tracer import trace
 from typing import Any
 
+# Uppercase month abbreviations, fixed so timestamps never depend on the locale.
+_MONTHS = ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC")
+
 @trace
 def get_timestamp() -> str:
     """
     Generates a formatted, uppercase timestamp string.
 
+    The fields are formatted directly from time.localtime() rather than through
+    strftime and upper(), which also keeps the month English in any locale.
+
     Returns:
         A string representing the current time in the format 'DDMMMYYYY_HHMMSSAM/PM',
         e.g., '07AUG2025_014830PM'.
     """
-    timestamp = datetime.now().strftime("%d%b%Y_%I%M%S%p").upper()
-    return timestamp
+    t = time.localtime()
+    meridiem = "AM" if t.tm_hour < 12 else "PM"
+    return (
+        f"{t.tm_mday:02d}{_MONTHS[t.tm_mon - 1]}{t.tm_year:04d}_"
+        f"{(t.tm_hour - 1) % 12 + 1:02d}{t.tm_min:02d}{t.tm_sec:02d}{meridiem}"
+    )